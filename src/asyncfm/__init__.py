@@ -1,6 +1,16 @@
 from .api import LastFMAPI
-from . import exceptions, types
+from . import analytics, blocking, cache, columnar, exceptions, export, history, types
 
 
 __version__ = "0.0.7"
-__all__ = ["LastFMAPI", "exceptions", "types"]
+__all__ = [
+    "LastFMAPI",
+    "analytics",
+    "blocking",
+    "cache",
+    "columnar",
+    "exceptions",
+    "export",
+    "history",
+    "types",
+]
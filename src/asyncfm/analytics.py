@@ -0,0 +1,260 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from heapq import nsmallest
+from itertools import repeat
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
+
+from asyncfm.columnar import TrackColumns
+from asyncfm.history import ScrobbleStore
+from asyncfm.types import Album, Artist, Responses, Track, WeeklyChart
+from asyncfm.utils import construct_model, to_unix
+
+Time = Union[datetime, date, int]
+
+
+class ScrobbleAnalytics:
+    """
+    Charts and play counts computed locally from scrobbles, e.g. mirrored with `HistorySync`.
+
+    Scrobbles are sorted by timestamp once, so any time window is found with a binary
+    search and counted with a group-by over the interned artist/album/title indexes:
+    vectorized with NumPy when it is installed, with `collections.Counter` otherwise.
+    Results use the same types as the `get_top_*` methods, without images.
+
+    Args:
+        columns (TrackColumns): The scrobbles to analyze. Rows without a timestamp are ignored.
+    """
+
+    def __init__(self, columns: TrackColumns):
+        self.strings = columns.strings
+        # Last.fm names the album of tracks without one ""
+        empty = self.strings.index("")
+        try:
+            import numpy
+        except ImportError:
+            self._numpy = None
+            order = sorted(
+                (index for index in range(len(columns)) if columns.timestamps[index]),
+                key=columns.timestamps.__getitem__,
+            )
+            self.timestamps = array("q", (columns.timestamps[i] for i in order))
+            self.artists = array("i", (columns.artists[i] for i in order))
+            self.albums = array("i", (columns.albums[i] for i in order))
+            if empty is not None:
+                self.albums = array(
+                    "i", (-1 if album == empty else album for album in self.albums)
+                )
+            self.titles = array("i", (columns.titles[i] for i in order))
+        else:
+            self._numpy = numpy
+            timestamps = numpy.array(columns.timestamps, dtype=numpy.int64)
+            order = numpy.flatnonzero(timestamps)
+            order = order[numpy.argsort(timestamps[order], kind="stable")]
+            self.timestamps = timestamps[order]
+            self.artists = numpy.array(columns.artists, dtype=numpy.int32)[order]
+            self.albums = numpy.array(columns.albums, dtype=numpy.int32)[order]
+            if empty is not None:
+                self.albums[self.albums == empty] = -1
+            self.titles = numpy.array(columns.titles, dtype=numpy.int32)[order]
+
+    @classmethod
+    def from_store(
+        cls,
+        store: ScrobbleStore,
+        username: str,
+        from_time: Optional[Time] = None,
+        to_time: Optional[Time] = None,
+    ) -> "ScrobbleAnalytics":
+        return cls(
+            store.load_columns(
+                username,
+                from_time=to_unix(from_time) if from_time is not None else None,
+                to_time=to_unix(to_time) if to_time is not None else None,
+            )
+        )
+
+    def _window(
+        self, from_time: Optional[Time], to_time: Optional[Time]
+    ) -> Tuple[int, int]:
+        start = 0 if from_time is None else to_unix(from_time)
+        end = 2**63 - 1 if to_time is None else to_unix(to_time)
+        if self._numpy is not None:
+            return (
+                int(self._numpy.searchsorted(self.timestamps, start, side="left")),
+                int(self._numpy.searchsorted(self.timestamps, end, side="right")),
+            )
+        return bisect_left(self.timestamps, start), bisect_right(self.timestamps, end)
+
+    def _count(
+        self, keys: array, other: Optional[array], lo: int, hi: int, limit: int
+    ) -> Tuple[List[Tuple[int, int, int]], int]:
+        """
+        (key, other key, play count) of the `limit` most played keys (or pairs) in [lo, hi),
+        and the number of distinct keys (or pairs) played. Pairs whose other key is -1 are skipped.
+        """
+        numpy = self._numpy
+        # ties are broken by string index in both paths, so they return the same charts
+        if numpy is None:
+            if other is None:
+                counter = Counter(zip(keys[lo:hi], repeat(-1)))
+            else:
+                counter = Counter(
+                    pair for pair in zip(keys[lo:hi], other[lo:hi]) if pair[1] >= 0
+                )
+            top = nsmallest(
+                limit, counter.items(), key=lambda item: (-item[1], item[0])
+            )
+            return [(key, second, count) for (key, second), count in top], len(counter)
+
+        if other is None:
+            counts = numpy.bincount(keys[lo:hi], minlength=len(self.strings))
+            top = numpy.argsort(-counts, kind="stable")[:limit]
+            return [
+                (int(key), -1, int(counts[key])) for key in top if counts[key]
+            ], int(numpy.count_nonzero(counts))
+
+        second = other[lo:hi]
+        first = keys[lo:hi][second >= 0].astype(numpy.int64)
+        second = second[second >= 0]
+        pairs, counts = numpy.unique(
+            first * len(self.strings) + second, return_counts=True
+        )
+        top = numpy.argsort(-counts, kind="stable")[:limit]
+        return [
+            (
+                int(pairs[index] // len(self.strings)),
+                int(pairs[index] % len(self.strings)),
+                int(counts[index]),
+            )
+            for index in top
+        ], len(pairs)
+
+    def playcount(
+        self, from_time: Optional[Time] = None, to_time: Optional[Time] = None
+    ) -> int:
+        lo, hi = self._window(from_time, to_time)
+        return hi - lo
+
+    def top_artists(
+        self,
+        from_time: Optional[Time] = None,
+        to_time: Optional[Time] = None,
+        limit: int = 50,
+    ) -> "Responses.Artists":
+        """Most played artists between two times (inclusive), as datetimes, dates or UNIX timestamps."""
+        lo, hi = self._window(from_time, to_time)
+        counts, total = self._count(self.artists, None, lo, hi, limit)
+        return construct_model(
+            Responses.Artists,
+            {
+                "artists": [
+                    construct_model(
+                        Artist,
+                        {"name": self.strings[key], "playcount": count, "rank": rank},
+                    )
+                    for rank, (key, _, count) in enumerate(counts, start=1)
+                ],
+                "total": total,
+            },
+        )
+
+    def top_albums(
+        self,
+        from_time: Optional[Time] = None,
+        to_time: Optional[Time] = None,
+        limit: int = 50,
+    ) -> "Responses.Albums":
+        """Most played albums between two times (inclusive), as datetimes, dates or UNIX timestamps."""
+        lo, hi = self._window(from_time, to_time)
+        counts, total = self._count(self.artists, self.albums, lo, hi, limit)
+        return construct_model(
+            Responses.Albums,
+            {
+                "albums": [
+                    construct_model(
+                        Album,
+                        {
+                            "artist": self.strings[artist],
+                            "title": self.strings[album],
+                            "images": None,
+                            "rank": rank,
+                            "playcount": count,
+                        },
+                    )
+                    for rank, (artist, album, count) in enumerate(counts, start=1)
+                ],
+                "total": total,
+            },
+        )
+
+    def top_tracks(
+        self,
+        from_time: Optional[Time] = None,
+        to_time: Optional[Time] = None,
+        limit: int = 50,
+    ) -> "Responses.Tracks":
+        """Most played tracks between two times (inclusive), as datetimes, dates or UNIX timestamps."""
+        lo, hi = self._window(from_time, to_time)
+        counts, total = self._count(self.artists, self.titles, lo, hi, limit)
+        return construct_model(
+            Responses.Tracks,
+            {
+                "tracks": [
+                    construct_model(
+                        Track,
+                        {
+                            "artist": self.strings[artist],
+                            "title": self.strings[title],
+                            "images": None,
+                            "rank": rank,
+                            "playcount": count,
+                        },
+                    )
+                    for rank, (artist, title, count) in enumerate(counts, start=1)
+                ],
+                "total": total,
+            },
+        )
+
+    def charts(
+        self,
+        kind: str = "artist",
+        step: int = 7 * 24 * 3600,
+        from_time: Optional[Time] = None,
+        to_time: Optional[Time] = None,
+        limit: int = 10,
+    ) -> "Responses.WeeklyCharts":
+        """
+        Rankings for consecutive periods of `step` seconds (a week by default), oldest first.
+
+        Periods start at `from_time` (defaults to the first scrobble) and the last one ends at or after `to_time` (defaults to the last scrobble).
+        """
+        top = {
+            "artist": self.top_artists,
+            "album": self.top_albums,
+            "track": self.top_tracks,
+        }.get(kind)
+        if top is None:
+            raise ValueError(f"Unknown chart kind: {kind}")
+        if not len(self.timestamps):
+            return construct_model(Responses.WeeklyCharts, {"charts": [], "total": 0})
+
+        start = to_unix(from_time) if from_time is not None else self.timestamps[0]
+        end = to_unix(to_time) if to_time is not None else self.timestamps[-1]
+        charts = [
+            construct_model(
+                WeeklyChart,
+                {
+                    "from_time": int(period),
+                    "to_time": int(period + step),
+                    # periods are half-open so a scrobble is only counted once
+                    "chart": top(period, period + step - 1, limit=limit),
+                },
+            )
+            for period in range(int(start), int(end) + 1, step)
+        ]
+        return construct_model(
+            Responses.WeeklyCharts, {"charts": charts, "total": len(charts)}
+        )
@@ -1,42 +1,360 @@
+import asyncio
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
 import aiohttp
-from typing import Any, Optional, Dict
+from typing import Any, AsyncIterator, Callable, Optional, Dict, List, Sequence, Union
+from ..api.breaker import CircuitBreaker
+from ..api.coalesce import SingleFlight
+from ..api.hedging import Hedging
+from ..api.instrumentation import Instrumentation, last_request
+from ..api.keys import KeyPool, PooledKey
+from ..api.options import current_options
+from ..api.retry import RetryPolicy
+from ..api.scheduler import Priority, RequestScheduler
+from ..api.streaming import JSONArrayStream
+from ..api.transport import Transport
 from ..api.user import LastFMUser
-from ..exceptions import get_error
+from ..cache import CacheBackend, CachePolicy, cache_key
+from ..exceptions import (
+    APIKeySuspendedError,
+    DeadlineExceededError,
+    HTTPError,
+    InvalidAPIKeyError,
+    ServerError,
+    get_error,
+)
+from ..utils import Interner, get_json_loads, request_key
+
+# time.monotonic() by which the current call must be done
+_deadline: "ContextVar[Optional[float]]" = ContextVar("asyncfm_deadline", default=None)
 
 
 class LastFMAPI:
     def __init__(
         self,
-        api_key: str,
+        api_key: Union[str, List[str]],
         session: "Optional[aiohttp.ClientSession]" = None,
+        rate_limit: Optional[float] = 5.0,
+        burst: int = 5,
+        max_concurrency: int = 10,
+        scheduler: "Optional[RequestScheduler]" = None,
+        coalesce: bool = True,
+        cache: "Optional[CacheBackend]" = None,
+        cache_policy: "Optional[CachePolicy]" = None,
+        transport: "Optional[Transport]" = None,
+        base_url: str = "https://ws.audioscrobbler.com/2.0/",
+        json_loads: "Optional[Callable[[bytes], Any]]" = None,
+        validate: bool = True,
+        retry_policy: "Optional[RetryPolicy]" = RetryPolicy(),
+        circuit_breaker: "Optional[CircuitBreaker]" = None,
+        timeout: Optional[float] = None,
+        hedging: "Optional[Hedging]" = None,
+        instrumentation: "Optional[Instrumentation]" = None,
+        interner: "Optional[Interner]" = None,
     ):
         self.api_key = api_key
-        self.base_url = "http://ws.audioscrobbler.com/2.0/"
-        self.session = session
+        self.base_url = base_url
+        self.instrumentation = instrumentation
+        # a shared transport is only released by the clients that opened it
+        self._owns_transport = transport is None
+        self._opened = False
+        self.transport = transport or Transport(
+            session=session,
+            trace_configs=[instrumentation.trace_config()] if instrumentation else None,
+        )
+        self.json_loads = json_loads or get_json_loads()
+        # False builds the response models without validating them
+        self.validate = validate
+        # repeated names and pictures share one object across responses
+        self.interner = interner or Interner()
+        # several keys are pooled, every key gets its own rate budget
+        api_keys = [api_key] if isinstance(api_key, str) else list(api_key)
+        if scheduler is not None and len(api_keys) > 1:
+            raise ValueError("scheduler can only be set with a single API key")
+        self.keys = KeyPool(
+            [
+                PooledKey(
+                    key,
+                    scheduler
+                    or RequestScheduler(
+                        rate=rate_limit, burst=burst, max_concurrency=max_concurrency
+                    ),
+                )
+                for key in api_keys
+            ]
+        )
+
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        # seconds a call may take, queueing and retries included
+        self.timeout = timeout
+        self.hedging = hedging
+        self.coalesce = coalesce
+        self._single_flight = SingleFlight()
+        self.cache = cache
+        self.cache_policy = cache_policy or CachePolicy()
+        self._background = set()
 
         self.user = LastFMUser(api=self)
-        
-    async def get_session(self):
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        return self.session
-        
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """The scheduler of the first API key."""
+        return self.keys.keys[0].scheduler
+
+    @property
+    def session(self) -> "Optional[aiohttp.ClientSession]":
+        return self.transport.session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        return await self.transport.get_session()
+
+    async def close(self):
+        if self._opened or self._owns_transport:
+            self._opened = False
+            await self.transport.close()
+
     async def __aenter__(self):
-        await self.get_session()
-        
+        if not self._opened:
+            await self.transport.open()
+            self._opened = True
+        return self
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session and not self.session.closed:
-            await self.session.close()
-    
-    async def _make_request(self, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
-        params = {"api_key": self.api_key, "format": "json", **params}
+        await self.close()
+
+    async def _make_request(
+        self, params: Dict[str, str], cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        data = await self._request_within_deadline(params, cache)
+        if self.instrumentation is not None and (
+            (request := last_request.get()) is not None
+        ):
+            # starts the parse timer of the calling LastFMUser method
+            request[:] = (params["method"], time.perf_counter())
+        return data
+
+    async def _request_within_deadline(
+        self, params: Dict[str, str], cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        timeout = current_options().get("timeout", self.timeout)
+        if timeout is None:
+            return await self._request(params, cache)
+
+        deadline = time.monotonic() + timeout
+        token = _deadline.set(deadline)
+        try:
+            return await asyncio.wait_for(self._request(params, cache), timeout)
+        except asyncio.TimeoutError:
+            if time.monotonic() < deadline:
+                # raised by the transport, not the deadline
+                raise
+            raise DeadlineExceededError(timeout) from None
+        finally:
+            _deadline.reset(token)
+
+    async def _request(
+        self, params: Dict[str, str], cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        # responses are shared between callers (cache, coalescing) and must not be mutated
+        fetch = self._send_request
+        if (
+            cache
+            and self.cache is not None
+            and (ttl := self.cache_policy.ttl_for(params))
+        ):
+            key = cache_key(params)
+            stale_ttl = self.cache_policy.stale_ttl
+
+            async def fetch(params: Dict[str, str]):
+                data = await self._send_request(params)
+                await self.cache.set(key, data, ttl, stale_ttl)
+                return data
+
+            if (entry := await self.cache.get(key)) is not None:
+                if not entry.fresh:
+                    self._revalidate(params, fetch)
+                return entry.value
+
+        if self.coalesce:
+            return await self._single_flight.do(
+                self._flight_key(params), lambda: fetch(params)
+            )
+        return await fetch(params)
+
+    def _flight_key(self, params: Dict[str, str]) -> tuple:
+        # a flight queues in the lane of the caller that started it, so only
+        # callers of the same priority share it
+        return (current_options().get("priority", Priority.NORMAL), request_key(params))
+
+    def _revalidate(self, params: Dict[str, str], fetch):
+        task = asyncio.ensure_future(
+            self._single_flight.do(self._flight_key(params), lambda: fetch(params))
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        # a failed refresh leaves the stale entry in place
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def _send_request(self, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        if self.circuit_breaker is not None:
+            # fail before queueing, not only once a slot is free
+            self.circuit_breaker.check()
+
+        policy = self.retry_policy
+        retry_on = policy.retry_on if policy is not None else ()
+        attempt = 0
+        while True:
+            healthy = len(self.keys.healthy)
+            try:
+                return await self._send_hedged(params)
+            except (APIKeySuspendedError, InvalidAPIKeyError):
+                # the key left the pool and the next one may work, unless it was the last
+                if len(self.keys.healthy) == healthy:
+                    raise
+            except retry_on:
+                attempt += 1
+                if attempt == policy.attempts:
+                    raise
+                await asyncio.sleep(policy.delay(attempt - 1))
+
+    async def _send_hedged(self, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        hedging = self.hedging
+        if hedging is None or not current_options().get("hedge", True):
+            return await self._send_once(params)
+
+        method = params.get("method")
+        delay = hedging.delay(method)
+        started = time.monotonic()
+        tasks = {asyncio.ensure_future(self._send_once(params))}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                # a hedge would only queue behind other requests
+                if not done and self.keys.pick().scheduler.queued == 0:
+                    tasks.add(asyncio.ensure_future(self._send_once(params)))
+
+            while True:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        hedging.record(method, time.monotonic() - started)
+                        return task.result()
+                if not tasks:
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send_once(self, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
         session = await self.get_session()
+        priority = current_options().get("priority", Priority.NORMAL)
+        key = self.keys.pick()
+        params = {"api_key": key.key, "format": "json", **params}
+
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            method = params["method"]
+            instrumentation.started(method, params)
+            queued_at = time.perf_counter()
+
+        try:
+            async with key.scheduler.slot(priority):
+                if instrumentation is not None:
+                    instrumentation.observe(
+                        "queue", method, time.perf_counter() - queued_at
+                    )
+                if self.circuit_breaker is None:
+                    data = await self._fetch(session, params)
+                else:
+                    # requests cut off by the deadline count as timeouts
+                    with self.circuit_breaker.guard(deadline=_deadline.get()):
+                        data = await self._fetch(session, params)
+        except Exception as error:
+            self._on_error(key, params["method"], error)
+            raise
+        key.scheduler.on_success()
+        return data
+
+    def _on_error(self, key: PooledKey, method: str, error: Exception):
+        if self.instrumentation is not None:
+            self.instrumentation.failed(method, error)
+        if isinstance(error, (APIKeySuspendedError, InvalidAPIKeyError)):
+            self.keys.remove(key)
+        elif isinstance(error, RetryPolicy.TRANSIENT_ERRORS):
+            key.scheduler.on_overload()
+
+    async def _stream_request(
+        self, params: Dict[str, str], path: Sequence[str]
+    ) -> AsyncIterator[Any]:
+        """
+        Yields the elements of the array at `path` of the response as they are received.
+
+        The request is neither cached, coalesced, hedged, retried nor bound by the
+        timeout, and it keeps its scheduler slot until the response is fully read or
+        the iteration stops.
+        """
+        session = await self.get_session()
+        priority = current_options().get("priority", Priority.NORMAL)
+        key = self.keys.pick()
+        params = {"api_key": key.key, "format": "json", **params}
+        if self.instrumentation is not None:
+            self.instrumentation.started(params["method"], params)
+
+        breaker = self.circuit_breaker
+        try:
+            async with key.scheduler.slot(priority):
+                with breaker.guard() if breaker is not None else nullcontext():
+                    async with session.get(
+                        url=self.base_url, params=params
+                    ) as response:
+                        if response.status != 200:
+                            await self._raise_error(response)
+                        stream = JSONArrayStream(path)
+                        async for chunk in response.content.iter_any():
+                            for element in stream.feed(chunk):
+                                yield element
+                        stream.close()
+        except Exception as error:
+            self._on_error(key, params["method"], error)
+            raise
+        key.scheduler.on_success()
+
+    async def _fetch(
+        self, session: aiohttp.ClientSession, params: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            sent_at = time.perf_counter()
 
         async with session.get(url=self.base_url, params=params) as response:
-            data: dict = await response.json()
-            if response.status == 200:
-                return data
+            if response.status != 200:
+                await self._raise_error(response)
+            body = await response.read()
+            if instrumentation is not None:
+                method = params["method"]
+                received_at = time.perf_counter()
+                instrumentation.observe("http", method, received_at - sent_at)
+                instrumentation.emit(
+                    "response", method, response.status, received_at - sent_at
+                )
+            data: dict = self.json_loads(body)
+            if instrumentation is not None:
+                instrumentation.observe(
+                    "decode", method, time.perf_counter() - received_at
+                )
+            return data
+
+    async def _raise_error(self, response: aiohttp.ClientResponse):
+        if response.content_type != "application/json":
+            # e.g. an HTML error page from a proxy, not worth downloading
+            error = ServerError if response.status >= 500 else HTTPError
+            raise error(code=response.status, message=response.reason)
 
-            error_code, error_message = data.get("error"), data.get("message")
+        data: dict = self.json_loads(await response.read())
+        error_code, error_message = data.get("error"), data.get("message")
 
-            raise get_error(code=error_code)(code=error_code, message=error_message)
\ No newline at end of file
+        raise get_error(code=error_code)(code=error_code, message=error_message)
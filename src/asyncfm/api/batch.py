@@ -0,0 +1,78 @@
+import asyncio
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+
+class BatchResult(NamedTuple):
+    username: str
+    value: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _aiter(items: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def as_completed(
+    fn: Callable[[str], Awaitable[Any]],
+    usernames: Union[Iterable[str], AsyncIterable[str]],
+    concurrency: int = 10,
+) -> AsyncIterator[BatchResult]:
+    """
+    Calls `fn` for every username, at most `concurrency` at a time, and yields the
+    results in completion order. Usernames are only pulled from the input when
+    there is room for another call, so it can be a huge or endless (async) iterable.
+    An exception raised for one username is returned in its result.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    async def call(username: str) -> BatchResult:
+        try:
+            return BatchResult(username=username, value=await fn(username))
+        except Exception as error:
+            return BatchResult(username=username, error=error)
+
+    source = _aiter(usernames)
+    pending: "Dict[asyncio.Task, str]" = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    username = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(call(username))] = username
+
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                del pending[task]
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
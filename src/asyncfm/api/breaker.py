@@ -0,0 +1,124 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import aiohttp
+
+from ..exceptions import (
+    CircuitOpenError,
+    OperationFailedError,
+    ServerError,
+    ServiceOfflineError,
+    ServiceUnavailableError,
+)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests while Last.fm is down.
+
+    After `failure_threshold` consecutive failures (server errors, connection errors
+    and timeouts) the circuit opens, and every call fails immediately with a
+    `CircuitOpenError` instead of waiting on the network. After `recovery_time`
+    seconds it is half-open: up to `trial_calls` requests go through, and the first
+    one to complete closes the circuit again or reopens it.
+
+    Any other outcome, including Last.fm errors such as an unknown user, proves the
+    service is up and resets the failure count.
+
+    Args:
+        failure_threshold (int, optional): Consecutive failures that open the circuit. Defaults to 5.
+        recovery_time (float, optional): Seconds the circuit stays open before trial requests. Defaults to 30.
+        trial_calls (int, optional): Requests allowed through at once while half-open. Defaults to 1.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    FAILURES = (
+        OperationFailedError,
+        ServiceOfflineError,
+        ServiceUnavailableError,
+        ServerError,
+        aiohttp.ClientError,
+        asyncio.TimeoutError,
+    )
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0,
+        trial_calls: int = 1,
+    ):
+        if failure_threshold < 1 or trial_calls < 1:
+            raise ValueError("failure_threshold and trial_calls must be at least 1")
+
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.trial_calls = trial_calls
+        self._failures = 0
+        self._opened_at = None
+        self._trials = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.recovery_time:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def check(self):
+        """Raises `CircuitOpenError` if a call would be rejected right now."""
+        state = self.state
+        if state == self.OPEN:
+            raise CircuitOpenError(
+                retry_after=self._opened_at + self.recovery_time - time.monotonic()
+            )
+        if state == self.HALF_OPEN and self._trials >= self.trial_calls:
+            raise CircuitOpenError(retry_after=0)
+
+    @contextmanager
+    def guard(self, deadline: Optional[float] = None):
+        """
+        Wraps a single request, rejecting it while open and recording its outcome.
+
+        Args:
+            deadline (float, optional): `time.monotonic()` by which the call must be done. A request cancelled once it has passed timed out, and counts as a failure.
+        """
+        self.check()
+        trial = self.state == self.HALF_OPEN
+        self._trials += trial
+        try:
+            yield
+        except self.FAILURES:
+            self._record(trial, failed=True)
+            raise
+        except Exception:
+            self._record(trial, failed=False)
+            raise
+        except BaseException:
+            if deadline is not None and time.monotonic() >= deadline:
+                self._record(trial, failed=True)
+            else:
+                # cancelled, the outcome is unknown
+                self._trials -= trial
+            raise
+        else:
+            self._record(trial, failed=False)
+
+    def _record(self, trial: bool, failed: bool):
+        self._trials -= trial
+        if not failed:
+            self._failures = 0
+            if trial or self.state == self.CLOSED:
+                self._opened_at = None
+                self._trials = 0
+            return
+
+        self._failures += 1
+        if trial or (
+            self._opened_at is None and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._trials = 0
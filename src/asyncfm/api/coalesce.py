@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key into a single execution.
+
+    The first caller starts the call, every other caller arriving while it is still
+    running awaits the same result (or exception). Cancelling one waiter does not
+    cancel the call for the others, the call is only cancelled once every waiter
+    has gone.
+    """
+
+    def __init__(self):
+        self._calls: "Dict[Hashable, asyncio.Future]" = {}
+        self._waiters: "Dict[asyncio.Future, int]" = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        self._waiters[call] = self._waiters.get(call, 0) + 1
+        try:
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            if call in self._waiters and self._waiters[call] == 1:
+                call.cancel()
+            raise
+        finally:
+            if call in self._waiters:
+                self._waiters[call] -= 1
+
+    def _forget(self, key: Hashable, call: "asyncio.Future"):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        self._waiters.pop(call, None)
+        if not call.cancelled():
+            # mark the exception as retrieved in case every waiter went away
+            call.exception()
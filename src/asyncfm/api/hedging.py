@@ -0,0 +1,49 @@
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class Hedging:
+    """
+    When to send a second copy of a slow request.
+
+    The latencies of the last `window` calls of every method are kept. Once there
+    are `min_samples` of them, a call still running after the `quantile` latency
+    (but at least `min_delay` seconds) is sent again, and the first response wins.
+    At the default 95th percentile, this costs about 5% more requests.
+
+    Args:
+        quantile (float, optional): The latency quantile after which to hedge. Defaults to 0.95.
+        min_delay (float, optional): Never hedge sooner than this, in seconds. Defaults to 0.05.
+        window (int, optional): Number of latencies kept per method. Defaults to 200.
+        min_samples (int, optional): Number of latencies needed before hedging a method. Defaults to 20.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        min_delay: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.window = window
+        self.min_samples = min_samples
+        self._latencies: "Dict[str, Deque[float]]" = {}
+
+    def record(self, method: str, latency: float):
+        latencies = self._latencies.get(method)
+        if latencies is None:
+            latencies = self._latencies[method] = deque(maxlen=self.window)
+        latencies.append(latency)
+
+    def delay(self, method: str) -> Optional[float]:
+        """Seconds after which to hedge a call, None while there are too few samples."""
+        latencies = self._latencies.get(method)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        return max(self.min_delay, ordered[int(self.quantile * (len(ordered) - 1))])
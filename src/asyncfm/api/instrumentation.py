@@ -0,0 +1,156 @@
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+# (method, time the response was returned) of the last request made by the current call
+last_request: "ContextVar[Optional[list]]" = ContextVar(
+    "asyncfm_last_request", default=None
+)
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds, in seconds."""
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Instrumentation:
+    """
+    Hooks, counters and latency histograms for the requests of a LastFMAPI.
+
+    Every HTTP request (retries and hedges included) is timed per `method` param in
+    four phases: "queue" (waiting for the scheduler), "http" (until the body is
+    read), "decode" (JSON) and "parse" (building the response models, for the
+    single-request `LastFMUser` methods). Connection setup and DNS lookups are timed
+    through an aiohttp `TraceConfig`. `render()` returns everything in the
+    Prometheus text format.
+
+    Hooks are called synchronously, so they must be quick:
+        start(method, params), response(method, status, seconds),
+        parsed(method, seconds), error(method, exception)
+
+    A client without instrumentation only pays for a few `is None` checks.
+    """
+
+    EVENTS = ("start", "response", "parsed", "error")
+
+    def __init__(self):
+        self.hooks: "Dict[str, List[Callable[..., Any]]]" = {
+            event: [] for event in self.EVENTS
+        }
+        self.requests: "Counter[str]" = Counter()
+        self.errors: "Counter[Tuple[str, str]]" = Counter()
+        self.phases: "Dict[Tuple[str, str], Histogram]" = {}
+        self.dns = Histogram()
+        self.connect = Histogram()
+        self.reused_connections = 0
+
+    def add_hook(self, event: str, hook: Callable[..., Any]):
+        if event not in self.hooks:
+            raise ValueError(f"Unknown event: {event}")
+        self.hooks[event].append(hook)
+
+    def emit(self, event: str, *args: Any):
+        for hook in self.hooks[event]:
+            hook(*args)
+
+    def observe(self, phase: str, method: str, seconds: float):
+        histogram = self.phases.get((phase, method))
+        if histogram is None:
+            histogram = self.phases[(phase, method)] = Histogram()
+        histogram.observe(seconds)
+
+    def started(self, method: str, params: Dict[str, Any]):
+        self.requests[method] += 1
+        self.emit("start", method, params)
+
+    def parsed(self, method: str, seconds: float):
+        self.observe("parse", method, seconds)
+        self.emit("parsed", method, seconds)
+
+    def failed(self, method: str, error: BaseException):
+        self.errors[(method, type(error).__name__)] += 1
+        self.emit("error", method, error)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """A TraceConfig timing DNS lookups and new connections, to pass to the aiohttp session."""
+
+        async def dns_start(session, context: SimpleNamespace, params):
+            context.dns_started = time.perf_counter()
+
+        async def dns_end(session, context: SimpleNamespace, params):
+            self.dns.observe(time.perf_counter() - context.dns_started)
+
+        async def connect_start(session, context: SimpleNamespace, params):
+            context.connect_started = time.perf_counter()
+
+        async def connect_end(session, context: SimpleNamespace, params):
+            self.connect.observe(time.perf_counter() - context.connect_started)
+
+        async def reused(session, context: SimpleNamespace, params):
+            self.reused_connections += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_dns_resolvehost_start.append(dns_start)
+        trace_config.on_dns_resolvehost_end.append(dns_end)
+        trace_config.on_connection_create_start.append(connect_start)
+        trace_config.on_connection_create_end.append(connect_end)
+        trace_config.on_connection_reuseconn.append(reused)
+        return trace_config
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            "# TYPE asyncfm_requests_total counter",
+            *(
+                f'asyncfm_requests_total{{method="{method}"}} {count}'
+                for method, count in sorted(self.requests.items())
+            ),
+            "# TYPE asyncfm_errors_total counter",
+            *(
+                f'asyncfm_errors_total{{method="{method}",error="{error}"}} {count}'
+                for (method, error), count in sorted(self.errors.items())
+            ),
+            "# TYPE asyncfm_phase_seconds histogram",
+        ]
+        for (phase, method), histogram in sorted(self.phases.items()):
+            lines += _histogram(
+                "asyncfm_phase_seconds", f'phase="{phase}",method="{method}"', histogram
+            )
+        lines.append("# TYPE asyncfm_dns_seconds histogram")
+        lines += _histogram("asyncfm_dns_seconds", "", self.dns)
+        lines.append("# TYPE asyncfm_connect_seconds histogram")
+        lines += _histogram("asyncfm_connect_seconds", "", self.connect)
+        lines += [
+            "# TYPE asyncfm_reused_connections_total counter",
+            f"asyncfm_reused_connections_total {self.reused_connections}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _histogram(name: str, labels: str, histogram: Histogram) -> List[str]:
+    prefix = f"{labels}," if labels else ""
+    lines, cumulative = [], 0
+    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
@@ -0,0 +1,56 @@
+from typing import List
+
+from ..api.scheduler import RequestScheduler
+
+
+class PooledKey:
+    """An API key with its own rate budget."""
+
+    def __init__(self, key: str, scheduler: RequestScheduler):
+        self.key = key
+        self.scheduler = scheduler
+        self.healthy = True
+
+    @property
+    def load(self) -> float:
+        """Requests in flight or queued, relative to the number allowed in flight."""
+        scheduler = self.scheduler
+        return (scheduler.in_flight + scheduler.queued) / scheduler.limit
+
+    @property
+    def tokens(self) -> float:
+        bucket = self.scheduler.bucket
+        return bucket.tokens if bucket is not None else float("inf")
+
+
+class KeyPool:
+    """
+    Spreads requests over several API keys, each with its own `RequestScheduler`.
+
+    Every request goes to the healthy key with the lowest load, the one with the
+    most rate limit tokens left on ties, so throughput grows with the number of
+    keys. Keys that Last.fm reports as suspended or invalid are taken out of the
+    pool for good, except the last one: with no other key to fall back to, requests
+    keep using it and raise the error Last.fm returns, until the key works again.
+    """
+
+    def __init__(self, keys: List[PooledKey]):
+        if not keys:
+            raise ValueError("At least one API key is required")
+
+        self.keys = keys
+
+    @property
+    def healthy(self) -> List[PooledKey]:
+        return [key for key in self.keys if key.healthy]
+
+    def pick(self) -> PooledKey:
+        healthy = self.healthy
+        if len(healthy) == 1:
+            return healthy[0]
+        return min(healthy, key=lambda key: (key.load, -key.tokens))
+
+    def remove(self, key: PooledKey):
+        """Takes `key` out of the pool, unless it is the last healthy one."""
+        if key.healthy and len(self.healthy) > 1:
+            key.healthy = False
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator
+
+_options: "ContextVar[Dict[str, Any]]" = ContextVar("asyncfm_options", default={})
+
+
+def current_options() -> "Dict[str, Any]":
+    """The options set by the enclosing `request_options` blocks, innermost first."""
+    return _options.get()
+
+
+@contextmanager
+def request_options(**options: Any) -> "Iterator[None]":
+    """
+    Overrides client settings for the requests made in this block, including from
+    tasks it starts. Blocks can be nested.
+
+        with request_options(timeout=2):
+            user = await lastfm.user.get_info("username")
+
+    Args:
+        timeout (float, optional): Seconds every call may take, queueing and retries included. None for no deadline.
+        hedge (bool, optional): False to never send hedged requests.
+        priority (Priority, optional): The scheduler lane to queue in. Defaults to Priority.NORMAL.
+    """
+    token = _options.set({**_options.get(), **options})
+    try:
+        yield
+    finally:
+        _options.reset(token)
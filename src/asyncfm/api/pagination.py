@@ -0,0 +1,44 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+async def iter_pages(
+    fetch: Callable[[int], Awaitable[T]],
+    pages_of: Callable[[T], Optional[int]],
+    first_page: int = 1,
+    window: int = 4,
+) -> AsyncIterator[T]:
+    """
+    Yields every page of a paginated endpoint, in order.
+
+    The first page is fetched on its own to learn the page count, then up to `window`
+    of the remaining pages are kept in flight while earlier ones are being consumed.
+
+    Args:
+        fetch (Callable): Coroutine function fetching a single page by number.
+        pages_of (Callable): Returns the total number of pages from a fetched page.
+        first_page (int, optional): The page to start from. Defaults to 1.
+        window (int, optional): Maximum number of pages fetched ahead. Defaults to 4.
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+
+    first = await fetch(first_page)
+    yield first
+
+    last_page = pages_of(first) or 0
+    next_page = first_page + 1
+    pending: "Deque[asyncio.Future[T]]" = deque()
+    try:
+        while next_page <= last_page or pending:
+            while next_page <= last_page and len(pending) < window:
+                pending.append(asyncio.ensure_future(fetch(next_page)))
+                next_page += 1
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,52 @@
+import random
+from typing import Tuple, Type
+
+from ..exceptions import (
+    OperationFailedError,
+    RateLimitExceededError,
+    ServerError,
+    ServiceOfflineError,
+    ServiceUnavailableError,
+)
+
+
+class RetryPolicy:
+    """
+    Which failures are retried, how many times and after how long.
+
+    Delays grow exponentially from `base_delay` up to `max_delay`, with full jitter
+    so that callers failing together do not retry together.
+
+    Args:
+        attempts (int, optional): Total number of attempts, including the first one. Defaults to 4.
+        base_delay (float, optional): Upper bound of the first delay, in seconds. Defaults to 0.5.
+        max_delay (float, optional): Upper bound of any delay, in seconds. Defaults to 30.
+        retry_on (Tuple[Type[Exception], ...], optional): The exceptions to retry. Defaults to the transient Last.fm errors.
+    """
+
+    TRANSIENT_ERRORS = (
+        OperationFailedError,
+        ServiceOfflineError,
+        ServiceUnavailableError,
+        ServerError,
+        RateLimitExceededError,
+    )
+
+    def __init__(
+        self,
+        attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        retry_on: "Tuple[Type[Exception], ...]" = TRANSIENT_ERRORS,
+    ):
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given failed attempt (0 for the first one)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Deque, List, Optional
+
+
+class Priority(IntEnum):
+    """Request lanes, served in this order."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, holding at most `burst` tokens.
+
+    It never waits itself: `RequestScheduler` takes tokens with `try_acquire` and
+    uses `wait_time` to know when to retry.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    @property
+    def wait_time(self) -> float:
+        """Seconds until the next token is available."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Takes a token if one is available right now, without waiting."""
+        if self.tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class RequestScheduler:
+    """
+    Gate every API call goes through before hitting the network.
+
+    Callers wait in one FIFO queue per `Priority` until one of `limit` in-flight
+    slots and a token from the bucket are both free, so the key is used at `rate`
+    requests per second (with bursts of up to `burst`) no matter how many
+    coroutines are waiting. Higher lanes are served first, but a waiting lane
+    passed over `starvation_limit` times in a row gets the next request, so
+    background traffic keeps a share of the key while interactive calls skip ahead.
+
+    `limit` adapts to the upstream (AIMD): every successful request grows it by
+    `1 / limit`, up to `max_concurrency`, and every sign of overload (rate limiting,
+    temporary failures) halves it, down to `min_concurrency`, at most once per
+    `decrease_interval` seconds so a burst of failures counts as a single signal.
+
+    Args:
+        rate (float, optional): Sustained requests per second. Defaults to 5, the limit documented by Last.fm. None disables rate limiting.
+        burst (int, optional): Number of requests that can be sent back to back after an idle period. Defaults to 5.
+        max_concurrency (int, optional): Maximum number of requests in flight at once. Defaults to 10.
+        min_concurrency (int, optional): Lowest the adaptive limit can go. Defaults to 1.
+        decrease_interval (float, optional): Minimum number of seconds between two decreases. Defaults to 1.
+        starvation_limit (int, optional): Number of times a waiting lane can be passed over in a row. Defaults to 8.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = 5.0,
+        burst: int = 5,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        decrease_interval: float = 1.0,
+        starvation_limit: int = 8,
+    ):
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("1 <= min_concurrency <= max_concurrency must hold")
+
+        self.bucket = TokenBucket(rate=rate, burst=burst) if rate else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.decrease_interval = decrease_interval
+        self.starvation_limit = starvation_limit
+        self._limit = float(max_concurrency)
+        self._last_decrease = float("-inf")
+        self._in_flight = 0
+        self._lanes: "List[Deque[asyncio.Future]]" = [deque() for _ in Priority]
+        # consecutive grants every waiting lane was passed over for
+        self._passed = [0 for _ in Priority]
+        self._timer: "Optional[asyncio.TimerHandle]" = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def on_success(self):
+        if self._limit < self.max_concurrency:
+            self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            self._wake()
+
+    def on_overload(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.decrease_interval:
+            self._last_decrease = now
+            self._limit = max(self.min_concurrency, self._limit / 2)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(map(len, self._lanes))
+
+    def _take_token(self) -> bool:
+        return self.bucket is None or self.bucket.try_acquire()
+
+    async def acquire(self, priority: Priority = Priority.NORMAL):
+        if self._in_flight < self.limit and not self.queued and self._take_token():
+            self._in_flight += 1
+            return
+
+        lane = self._lanes[priority]
+        waiter = asyncio.get_running_loop().create_future()
+        lane.append(waiter)
+        self._wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over right before the cancellation
+                self.release()
+            elif waiter in lane:
+                lane.remove(waiter)
+            raise
+
+    def release(self):
+        self._in_flight -= 1
+        self._wake()
+
+    def _next_lane(self) -> "Deque[asyncio.Future]":
+        waiting = [index for index, lane in enumerate(self._lanes) if lane]
+        chosen = next(
+            (
+                index
+                for index in waiting[1:]
+                if self._passed[index] >= self.starvation_limit
+            ),
+            waiting[0],
+        )
+        for index, lane in enumerate(self._lanes):
+            passed = lane and index != chosen
+            self._passed[index] = self._passed[index] + 1 if passed else 0
+        return self._lanes[chosen]
+
+    def _wake(self):
+        while self.queued and self._in_flight < self.limit:
+            if self.bucket is not None and self.bucket.tokens < 1:
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(
+                        self.bucket.wait_time, self._on_timer
+                    )
+                return
+
+            waiter = self._next_lane().popleft()
+            if waiter.done():
+                # cancelled, not removed from its lane yet
+                continue
+            self._take_token()
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _on_timer(self):
+        self._timer = None
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.NORMAL):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,118 @@
+import codecs
+import json
+import re
+from typing import Any, List, Sequence, Tuple
+
+_SEPARATORS = re.compile(r"[\s,]*")
+_WHITESPACE = re.compile(r"\s*")
+_NUMBER_TAIL = re.compile(r"[\d.eE+-]*")
+
+
+class JSONArrayStream:
+    """
+    Extracts the elements of one array of a JSON document while it is downloading.
+
+    Chunks of the body are passed to `feed` as they arrive, and every element of
+    the array found at `path` (e.g. `("recenttracks", "track")`) is returned as
+    soon as it is complete. Only the element being received is buffered, so memory
+    does not depend on the size of the array. Elements are decoded with the C
+    scanner of the standard `json` module, the rest of the document is skipped.
+
+    Args:
+        path (Sequence[str]): The keys leading to the array, from the root object.
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path = path
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buffer = ""
+        self._position = 0
+        # number of keys of the path found so far
+        self._depth = 0
+        self._state = "start"
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Adds a chunk of the body and returns the elements it completed."""
+        self._buffer = self._buffer[self._position :] + self._decoder.decode(chunk)
+        self._position = 0
+        elements = []
+        while self._state != "done" and self._step(elements):
+            pass
+        return elements
+
+    def close(self):
+        """Checks that the whole array was received."""
+        if self._state != "done":
+            raise ValueError("Incomplete JSON document")
+
+    def _scan(self, buffer: str, position: int) -> Tuple[Any, int]:
+        value, end = self._raw_decode(buffer, position)
+        if buffer[end - 1] not in '"]}' and _NUMBER_TAIL.match(
+            buffer, end
+        ).end() == len(buffer):
+            # a number or literal cut by the end of the chunk, e.g. 123 of 12345 or -0 of -0.5
+            raise ValueError("Truncated value")
+        return value, end
+
+    def _step(self, elements: List[Any]) -> bool:
+        """Consumes one token or element, False when more data is needed."""
+        buffer = self._buffer
+        position = _SEPARATORS.match(buffer, self._position).end()
+        if position == len(buffer):
+            return False
+
+        if self._state == "array":
+            if buffer[position] == "]":
+                self._state = "done"
+                return True
+            try:
+                element, self._position = self._scan(buffer, position)
+            except ValueError:
+                return False
+            elements.append(element)
+            return True
+
+        if self._state == "start":
+            if buffer[position] != "{":
+                self._state = "done"
+                return True
+            self._state = "key"
+            self._position = position + 1
+            return True
+
+        # state "key": the next member of an object on the path
+        if buffer[position] == "}":
+            self._state = "done"
+            return True
+        try:
+            key, position = self._scan(buffer, position)
+        except ValueError:
+            return False
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            return False
+        position = _WHITESPACE.match(buffer, position + 1).end()
+        if position == len(buffer):
+            return False
+
+        if key != self.path[self._depth]:
+            try:
+                _, self._position = self._scan(buffer, position)
+            except ValueError:
+                return False
+            return True
+
+        self._depth += 1
+        expected = "[" if self._depth == len(self.path) else "{"
+        if buffer[position] != expected:
+            # e.g. null, the array is not there
+            self._state = "done"
+            return True
+        self._state = "array" if expected == "[" else "key"
+        self._position = position + 1
+        return True
@@ -0,0 +1,89 @@
+import asyncio
+from typing import List, Optional
+
+import aiohttp
+
+
+def _accept_encoding() -> str:
+    # aiohttp only decodes brotli when one of these packages is installed
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        return "gzip, deflate, br"
+    return "gzip, deflate"
+
+
+class Transport:
+    """
+    Connection pool and HTTP session shared by one or more LastFMAPI instances.
+
+    The session is created on first use, under a lock so concurrent first calls
+    cannot create several of them, and on a single connector that keeps connections
+    alive and caches DNS lookups. Every `open()` must be paired with a `close()`;
+    the session is closed once the last user releases it.
+
+    Args:
+        limit (int, optional): Maximum number of open connections. Defaults to 100.
+        limit_per_host (int, optional): Maximum number of open connections to the API host. Defaults to 30.
+        keepalive_timeout (float, optional): Seconds an idle connection is kept open. Defaults to 30.
+        dns_ttl (int, optional): Seconds DNS lookups are cached for. Defaults to 300.
+        session (aiohttp.ClientSession, optional): Use this session instead of creating one.
+        trace_configs (List[aiohttp.TraceConfig], optional): Traces to attach to the session created.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 30,
+        keepalive_timeout: float = 30,
+        dns_ttl: int = 300,
+        session: "Optional[aiohttp.ClientSession]" = None,
+        trace_configs: "Optional[List[aiohttp.TraceConfig]]" = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.session = session
+        self.trace_configs = trace_configs
+        self._users = 0
+        self._lock = asyncio.Lock()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            async with self._lock:
+                if self.session is None or self.session.closed:
+                    self.session = self._create_session()
+        return self.session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_ttl,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers={"Accept-Encoding": _accept_encoding()},
+            trace_configs=self.trace_configs,
+        )
+
+    async def open(self) -> aiohttp.ClientSession:
+        self._users += 1
+        return await self.get_session()
+
+    async def close(self):
+        self._users = max(0, self._users - 1)
+        if self._users == 0 and self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -1,15 +1,94 @@
-from datetime import datetime
-from typing import Optional
+import asyncio
+import functools
+import time
+from contextlib import aclosing
+from datetime import date, datetime
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from asyncfm import api
-from asyncfm.types import Album, Responses, Artist, Tag, Track, User
-from asyncfm.utils import get_images_
+from asyncfm.api.batch import BatchResult, as_completed
+from asyncfm.api.instrumentation import last_request
+from asyncfm.api.pagination import iter_pages
+from asyncfm.columnar import TrackColumns
+from asyncfm.types import (
+    Album,
+    Responses,
+    Artist,
+    ChartRange,
+    Image,
+    ProfileSnapshot,
+    Tag,
+    Track,
+    User,
+    WeeklyChart,
+)
+from asyncfm.utils import construct_model, to_int, to_unix
+
+
+# maximum `limit` accepted by the paginated endpoints
+MAX_RECENT_TRACKS_LIMIT = 200
+MAX_TOP_LIMIT = 1000
+
+M = TypeVar("M")
+
+
+def _pages(attr: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "page": to_int(attr.get("page")),
+        "total_pages": to_int(attr.get("totalPages")),
+    }
+
+
+def _timed_parse(fn):
+    """Records how long a single-request method takes to build its result from the response."""
+
+    @functools.wraps(fn)
+    async def wrapper(self: "LastFMUser", *args, **kwargs):
+        instrumentation = self.api.instrumentation
+        if instrumentation is None:
+            return await fn(self, *args, **kwargs)
+
+        request = []
+        token = last_request.set(request)
+        try:
+            result = await fn(self, *args, **kwargs)
+        finally:
+            last_request.reset(token)
+        if request:
+            method, returned_at = request
+            instrumentation.parsed(method, time.perf_counter() - returned_at)
+        return result
+
+    return wrapper
 
 
 class LastFMUser:
     def __init__(self, api: "api.LastFMAPI"):
         self.api = api
 
+    def _build(self, model: Type[M], **fields) -> M:
+        # trusted mode skips pydantic validation, fields are converted by the parsers
+        if self.api.validate:
+            return model(**fields)
+        return construct_model(model, fields)
+
+    def _images(self, images: List[Dict]) -> Image:
+        return self.api.interner.image(images, construct=not self.api.validate)
+
+    @_timed_parse
     async def get_info(self, username: str):
         params = {
             "method": "user.getinfo",
@@ -18,18 +97,19 @@ class LastFMUser:
         data = await self.api._make_request(params=params)
 
         if user_data := data.get("user"):
-            return User(
+            return self._build(
+                User,
                 name=user_data["name"],
                 age=user_data.get("age"),
-                subscriber=user_data.get("subscriber"),
+                subscriber=to_int(user_data.get("subscriber")),
                 realname=user_data.get("realname"),
-                bootstrap=user_data.get("bootstrap"),
-                playcount=user_data.get("playcount"),
-                artist_count=user_data.get("artist_count"),
-                playlists=user_data.get("playlists"),
-                track_count=user_data.get("track_count"),
-                album_count=user_data.get("album_count"),
-                image=get_images_(user_data.get("image")),
+                bootstrap=to_int(user_data.get("bootstrap")),
+                playcount=to_int(user_data.get("playcount")),
+                artist_count=to_int(user_data.get("artist_count")),
+                playlists=to_int(user_data.get("playlists")),
+                track_count=to_int(user_data.get("track_count")),
+                album_count=to_int(user_data.get("album_count")),
+                image=self._images(user_data.get("image")),
                 registered=datetime.fromtimestamp(
                     int(user_data["registered"]["unixtime"])
                 ),
@@ -39,6 +119,50 @@ class LastFMUser:
                 type=user_data.get("type"),
             )
 
+    async def get_profile_snapshot(
+        self, username: str, period: str = "overall", limit: int = 5
+    ) -> ProfileSnapshot:
+        """
+        Fetches the profile, recent tracks, top artists, albums, tracks and tags of a Last.fm user at once.
+
+        The six requests are sent concurrently, so this takes about as long as the slowest of them.
+        A part that fails is left empty and its exception is stored in `errors`, the other parts are still returned.
+
+        Args:
+        username (str): The Last.fm username to fetch the profile of.
+        period (str, optional): The time period of the top charts. Defaults to "overall".
+        limit (int, optional): The number of recent tracks and of items in each chart. Defaults to 5.
+
+        Returns:
+        ProfileSnapshot: Every part that could be fetched, and the errors of the rest.
+        """
+        parts = {
+            "user": self.get_info(username=username),
+            "recent_tracks": self.get_recent_tracks(username=username, limit=limit),
+            "top_artists": self.get_top_artists(
+                username=username, period=period, limit=limit
+            ),
+            "top_albums": self.get_top_albums(
+                username=username, period=period, limit=limit
+            ),
+            "top_tracks": self.get_top_tracks(
+                username=username, period=period, limit=limit
+            ),
+            "top_tags": self.get_top_tags(username=username, limit=limit),
+        }
+        results = await asyncio.gather(*parts.values(), return_exceptions=True)
+
+        fields, errors = {}, {}
+        for name, result in zip(parts, results):
+            if isinstance(result, Exception):
+                errors[name] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                fields[name] = result
+        return self._build(ProfileSnapshot, errors=errors, **fields)
+
+    @_timed_parse
     async def get_recent_tracks(
         self,
         username: str,
@@ -47,7 +171,8 @@ class LastFMUser:
         extended: bool = False,
         from_time: int = None,
         to_time: int = None,
-    ) -> Optional["Responses.Tracks"]:
+        columnar: bool = False,
+    ) -> Optional[Union["Responses.Tracks", "TrackColumns"]]:
         """
         Fetches the recent tracks of a Last.fm user.
 
@@ -58,6 +183,7 @@ class LastFMUser:
         extended (bool, optional): Includes extended data in each artist, and whether or not the user has loved each track. Defaults to False.
         from_time (int, optional): Beginning timestamp of a range - only display scrobbles after this time, in UNIX timestamp format (integer number of seconds since 00:00:00, January 1st 1970 UTC). This must be in the UTC time zone.
         to_time (int, optional): End timestamp of a range - only display scrobbles before this time, in UNIX timestamp format (integer number of seconds since 00:00:00, January 1st 1970 UTC). This must be in the UTC time zone.
+        columnar (bool, optional): Returns the tracks as compact TrackColumns instead of Track objects. Defaults to False.
 
         Returns:
         Optional[APIResponse]: A list of Track objects representing the recent tracks, or None if there was an error.
@@ -75,25 +201,180 @@ class LastFMUser:
             params["to"] = to_time
 
         data = await self.api._make_request(params=params)
+        if columnar:
+            return self._parse_recent_tracks_columns(data)
+        return self._parse_recent_tracks(data)
 
+    def _parse_recent_tracks_columns(self, data: Dict[str, Any]):
         if recent_tracks := data.get("recenttracks"):
-            return Responses.Tracks(
-                tracks=list(
-                    map(
-                        lambda track: Track(
-                            artist=track["artist"]["#text"],
-                            title=track["name"],
-                            album=track["album"]["#text"],
-                            images=get_images_(track.get("image")),
-                            now_playing="@attr" in track
-                            and "nowplaying" in track["@attr"],
-                        ),
-                        recent_tracks["track"],
-                    )
-                ),
-                total=recent_tracks.get("@attr", {}).get("total"),
+            attr = recent_tracks.get("@attr", {})
+            columns = TrackColumns(total=to_int(attr.get("total")), **_pages(attr))
+            for track in recent_tracks["track"]:
+                artist = track["artist"]
+                columns.append(
+                    # extended responses name the artist "name" instead of "#text"
+                    artist=artist.get("#text") or artist.get("name"),
+                    title=track["name"],
+                    album=track["album"]["#text"],
+                    timestamp=int(track["date"]["uts"]) if "date" in track else None,
+                    now_playing="@attr" in track and "nowplaying" in track["@attr"],
+                    loved=track.get("loved") == "1",
+                )
+            return columns
+
+    def _parse_recent_tracks(self, data: Dict[str, Any]):
+        if recent_tracks := data.get("recenttracks"):
+            return self._build(
+                Responses.Tracks,
+                tracks=list(map(self._parse_recent_track, recent_tracks["track"])),
+                total=to_int(recent_tracks.get("@attr", {}).get("total")),
+                **_pages(recent_tracks.get("@attr", {})),
+            )
+
+    def _parse_recent_track(self, track: Dict[str, Any]) -> Track:
+        intern = self.api.interner.string
+        return self._build(
+            Track,
+            # extended responses name the artist "name" instead of "#text"
+            artist=intern(track["artist"].get("#text") or track["artist"].get("name")),
+            title=intern(track["name"]),
+            album=intern(track["album"]["#text"]),
+            images=self._images(track.get("image")),
+            now_playing="@attr" in track and "nowplaying" in track["@attr"],
+            timestamp=int(track["date"]["uts"]) if "date" in track else None,
+            loved=track["loved"] == "1" if "loved" in track else None,
+            mbid=track.get("mbid") or None,
+            artist_mbid=track["artist"].get("mbid") or None,
+            album_mbid=track["album"].get("mbid") or None,
+        )
+
+    async def stream_recent_tracks(
+        self,
+        username: str,
+        limit: int = MAX_RECENT_TRACKS_LIMIT,
+        page: int = 1,
+        extended: bool = False,
+        from_time: int = None,
+        to_time: int = None,
+    ) -> AsyncIterator[Track]:
+        """
+        Yields the tracks of a page of recent tracks while the response is downloading.
+
+        The first track is available as soon as its part of the body arrives, and only one track of the raw response is held at a time.
+        The response is not cached, and the request is not retried.
+
+        Args:
+        username (str): The Last.fm username to fetch the recent tracks of.
+        limit (int, optional): The number of results to fetch per page. Defaults to 200, the maximum.
+        page (int, optional): The page number to fetch. Defaults to first page.
+        extended (bool, optional): Includes extended data in each artist, and whether or not the user has loved each track. Defaults to False.
+        from_time (int, optional): Only yield scrobbles after this UNIX timestamp.
+        to_time (int, optional): Only yield scrobbles before this UNIX timestamp.
+
+        Yields:
+        Track: The tracks of the page, in order.
+        """
+        params = {
+            "method": "user.getrecenttracks",
+            "user": username,
+            "limit": limit,
+            "page": page,
+            "extended": 1 if extended else 0,
+        }
+        if from_time is not None:
+            params["from"] = from_time
+        if to_time is not None:
+            params["to"] = to_time
+
+        async with aclosing(
+            self.api._stream_request(params, ("recenttracks", "track"))
+        ) as tracks:
+            async for track in tracks:
+                yield self._parse_recent_track(track)
+
+    async def iter_recent_track_pages(
+        self,
+        username: str,
+        extended: bool = False,
+        from_time: int = None,
+        to_time: int = None,
+        first_page: int = 1,
+        window: int = 4,
+    ) -> AsyncIterator["Responses.Tracks"]:
+        """
+        Iterates over the pages of the listening history of a Last.fm user, newest first.
+
+        Pages are requested with the maximum allowed limit and up to `window` of them are fetched concurrently.
+        Unless `to_time` is given, the range is anchored to the time the iteration started so that tracks scrobbled in the meantime do not shift the pages being read.
+
+        Args:
+        username (str): The Last.fm username to fetch the recent tracks of.
+        extended (bool, optional): Includes extended data in each artist, and whether or not the user has loved each track. Defaults to False.
+        from_time (int, optional): Only yield scrobbles after this UNIX timestamp.
+        to_time (int, optional): Only yield scrobbles before this UNIX timestamp. Defaults to the current time.
+        first_page (int, optional): The page to start from. Defaults to first page.
+        window (int, optional): The number of pages fetched concurrently. Defaults to 4.
+
+        Yields:
+        Responses.Tracks: Every page, in order.
+        """
+        if to_time is None:
+            to_time = int(time.time())
+
+        async def fetch(page: int):
+            return await self.get_recent_tracks(
+                username=username,
+                limit=MAX_RECENT_TRACKS_LIMIT,
+                page=page,
+                extended=extended,
+                from_time=from_time,
+                to_time=to_time,
             )
 
+        async for response in iter_pages(
+            fetch,
+            lambda response: response and response.total_pages,
+            first_page=first_page,
+            window=window,
+        ):
+            if response:
+                yield response
+
+    async def iter_recent_tracks(
+        self,
+        username: str,
+        extended: bool = False,
+        from_time: int = None,
+        to_time: int = None,
+        window: int = 4,
+    ) -> AsyncIterator[Track]:
+        """
+        Iterates over the whole listening history of a Last.fm user, newest first.
+
+        Pages are fetched as in `iter_recent_track_pages`.
+        To fetch only what was scrobbled since a previous run, pass the newest `Track.timestamp` seen as `from_time`.
+
+        Args:
+        username (str): The Last.fm username to fetch the recent tracks of.
+        extended (bool, optional): Includes extended data in each artist, and whether or not the user has loved each track. Defaults to False.
+        from_time (int, optional): Only yield scrobbles after this UNIX timestamp.
+        to_time (int, optional): Only yield scrobbles before this UNIX timestamp. Defaults to the current time.
+        window (int, optional): The number of pages fetched concurrently. Defaults to 4.
+
+        Yields:
+        Track: The tracks of every page, in order.
+        """
+        async for response in self.iter_recent_track_pages(
+            username=username,
+            extended=extended,
+            from_time=from_time,
+            to_time=to_time,
+            window=window,
+        ):
+            for track in response.tracks:
+                yield track
+
+    @_timed_parse
     async def get_top_artists(
         self,
         username: str,
@@ -121,22 +402,88 @@ class LastFMUser:
             "page": page,
         }
         data = await self.api._make_request(params=params)
+        return self._parse_top_artists(data)
+
+    def _parse_top_artists(self, data: Dict[str, Any]):
         if artists := data.get("topartists"):
-            return Responses.Artists(
-                artists=list(
-                    map(
-                        lambda artist: Artist(
-                            name=artist["name"],
-                            images=get_images_(artist.get("image")),
-                            playcount=artist["playcount"],
-                            rank=artist["@attr"]["rank"],
-                        ),
-                        artists["artist"],
-                    )
-                ),
-                total=artists.get("@attr").get("total"),
+            return self._build(
+                Responses.Artists,
+                artists=list(map(self._parse_top_artist, artists["artist"])),
+                total=to_int(artists.get("@attr").get("total")),
+                **_pages(artists.get("@attr")),
             )
 
+    def _parse_top_artist(self, artist: Dict[str, Any]) -> Artist:
+        return self._build(
+            Artist,
+            name=self.api.interner.string(artist["name"]),
+            images=self._images(artist.get("image")),
+            playcount=int(artist["playcount"]),
+            rank=int(artist["@attr"]["rank"]),
+        )
+
+    async def stream_top_artists(
+        self,
+        username: str,
+        period: str = "overall",
+        limit: int = MAX_TOP_LIMIT,
+        page: int = 1,
+    ) -> AsyncIterator[Artist]:
+        """
+        Yields the artists of a page of top artists while the response is downloading.
+
+        The response is not cached, and the request is not retried.
+
+        Args:
+        username (str): The Last.fm username to fetch top artists for.
+        period (str, optional): The time period over which to retrieve top artists for. Defaults to "overall".
+        limit (int, optional): The number of results to fetch per page. Defaults to 1000, the maximum.
+        page (int, optional): The page number to fetch. Defaults to first page.
+
+        Yields:
+        Artist: The artists of the page, by rank.
+        """
+        params = {
+            "method": "user.gettopartists",
+            "user": username,
+            "period": period,
+            "limit": limit,
+            "page": page,
+        }
+        async with aclosing(
+            self.api._stream_request(params, ("topartists", "artist"))
+        ) as artists:
+            async for artist in artists:
+                yield self._parse_top_artist(artist)
+
+    async def iter_top_artists(
+        self, username: str, period: str = "overall", window: int = 4
+    ) -> AsyncIterator[Artist]:
+        """
+        Iterates over all the top artists of a Last.fm user, by rank.
+
+        Args:
+        username (str): The Last.fm username to fetch top artists for.
+        period (str, optional): The time period over which to retrieve top artists for. Defaults to "overall".
+        window (int, optional): The number of pages fetched concurrently. Defaults to 4.
+
+        Yields:
+        Artist: The artists of every page, in order.
+        """
+
+        async def fetch(page: int):
+            return await self.get_top_artists(
+                username=username, period=period, limit=MAX_TOP_LIMIT, page=page
+            )
+
+        async for response in iter_pages(
+            fetch, lambda response: response and response.total_pages, window=window
+        ):
+            if response:
+                for artist in response.artists:
+                    yield artist
+
+    @_timed_parse
     async def get_top_albums(
         self, username: str, period: str = "overall", limit: int = 5, page: int = 1
     ) -> Optional["Responses.Albums"]:
@@ -159,30 +506,65 @@ class LastFMUser:
             "page": page,
         }
         data = await self.api._make_request(params=params)
+        return self._parse_top_albums(data)
+
+    def _parse_top_albums(self, data: Dict[str, Any]):
         if albums := data.get("topalbums"):
-            return Responses.Albums(
+            return self._build(
+                Responses.Albums,
                 albums=list(
                     map(
-                        lambda album: Album(
-                            artist=album["artist"]["name"],
-                            title=album["name"],
-                            images=get_images_(album.get("image")),
-                            playcount=album["playcount"],
-                            rank=album["@attr"]["rank"],
+                        lambda album: self._build(
+                            Album,
+                            artist=self.api.interner.string(album["artist"]["name"]),
+                            title=self.api.interner.string(album["name"]),
+                            images=self._images(album.get("image")),
+                            playcount=int(album["playcount"]),
+                            rank=int(album["@attr"]["rank"]),
                         ),
                         albums["album"],
                     )
                 ),
-                total=albums.get("@attr").get("total"),
+                total=to_int(albums.get("@attr").get("total")),
+                **_pages(albums.get("@attr")),
+            )
+
+    async def iter_top_albums(
+        self, username: str, period: str = "overall", window: int = 4
+    ) -> AsyncIterator[Album]:
+        """
+        Iterates over all the top albums of a Last.fm user, by rank.
+
+        Args:
+            username (str): The Last.fm username to fetch top albums for.
+            period (str, optional): The time period over which to retrieve top albums for. Defaults to "overall".
+            window (int, optional): The number of pages fetched concurrently. Defaults to 4.
+
+        Yields:
+            Album: The albums of every page, in order.
+        """
+
+        async def fetch(page: int):
+            return await self.get_top_albums(
+                username=username, period=period, limit=MAX_TOP_LIMIT, page=page
             )
 
+        async for response in iter_pages(
+            fetch, lambda response: response and response.total_pages, window=window
+        ):
+            if response:
+                for album in response.albums:
+                    yield album
+
+    @_timed_parse
     async def get_top_tracks(
         self,
         username: str,
         period: str = "overall",
         limit: int = 5,
         page: int = 1,
-    ) -> Optional["Responses.Tracks"]:
+        columnar: bool = False,
+    ) -> Optional[Union["Responses.Tracks", "TrackColumns"]]:
         """
         Fetches the top tracks for a Last.fm user.
 
@@ -191,6 +573,7 @@ class LastFMUser:
         period (str, optional): The time period over which to retrieve top tracks for. Defaults to "overall". Possible values are "overall", "7day", "1month", "3month", "6month", "12month".
         limit (int, optional): The number of results to fetch per page. Defaults to 50.
         page (int, optional): The page number to fetch. Defaults to first page.
+        columnar (bool, optional): Returns the tracks as compact TrackColumns instead of Track objects. Defaults to False.
 
         Returns:
         Optional["APIResponse"]: A list of Track objects representing the top tracks, or None if there was an error.
@@ -204,20 +587,71 @@ class LastFMUser:
         }
 
         data = await self.api._make_request(params=params)
+        if columnar:
+            return self._parse_chart_columns(data.get("toptracks"))
+        return self._parse_top_tracks(data)
 
+    def _parse_top_tracks(self, data: Dict[str, Any]):
         if top_tracks := data.get("toptracks"):
-            return Responses.Tracks(
+            return self._build(
+                Responses.Tracks,
                 tracks=[
-                    Track(
-                        artist=track["artist"]["name"],
-                        title=track["name"],
-                        images=get_images_(track.get("image")),
+                    self._build(
+                        Track,
+                        artist=self.api.interner.string(track["artist"]["name"]),
+                        title=self.api.interner.string(track["name"]),
+                        images=self._images(track.get("image")),
                     )
                     for track in top_tracks["track"]
                 ],
-                total=top_tracks.get("@attr", {}).get("total"),
+                total=to_int(top_tracks.get("@attr", {}).get("total")),
+                **_pages(top_tracks.get("@attr", {})),
+            )
+
+    def _parse_chart_columns(self, chart: Optional[Dict[str, Any]]):
+        if chart:
+            attr = chart.get("@attr", {})
+            columns = TrackColumns(
+                total=to_int(attr.get("total")) or len(chart["track"]), **_pages(attr)
+            )
+            for track in chart["track"]:
+                artist = track["artist"]
+                columns.append(
+                    artist=artist.get("name") or artist.get("#text"),
+                    title=track["name"],
+                    rank=int(track["@attr"]["rank"]),
+                    playcount=int(track["playcount"]),
+                )
+            return columns
+
+    async def iter_top_tracks(
+        self, username: str, period: str = "overall", window: int = 4
+    ) -> AsyncIterator[Track]:
+        """
+        Iterates over all the top tracks of a Last.fm user, by rank.
+
+        Args:
+        username (str): The Last.fm username to fetch top tracks for.
+        period (str, optional): The time period over which to retrieve top tracks for. Defaults to "overall".
+        window (int, optional): The number of pages fetched concurrently. Defaults to 4.
+
+        Yields:
+        Track: The tracks of every page, in order.
+        """
+
+        async def fetch(page: int):
+            return await self.get_top_tracks(
+                username=username, period=period, limit=MAX_TOP_LIMIT, page=page
             )
 
+        async for response in iter_pages(
+            fetch, lambda response: response and response.total_pages, window=window
+        ):
+            if response:
+                for track in response.tracks:
+                    yield track
+
+    @_timed_parse
     async def get_top_tags(
         self,
         username: str,
@@ -245,44 +679,141 @@ class LastFMUser:
         data = await self.api._make_request(params=params)
 
         if top_tags := data.get("toptags"):
-            return Responses.Tags(
-                tags=[Tag(**tag) for tag in top_tags["tag"]],
+            return self._build(
+                Responses.Tags,
+                tags=[
+                    self._build(
+                        Tag, name=tag["name"], count=int(tag["count"]), url=tag["url"]
+                    )
+                    for tag in top_tags["tag"]
+                ],
                 total=len(top_tags["tag"]),
             )
 
+    @_timed_parse
+    async def get_weekly_chart_list(
+        self, username: str
+    ) -> Optional["Responses.ChartRanges"]:
+        """
+        Fetches the weeks for which Last.fm has charts of a user.
+
+        Args:
+            username (str): The Last.fm username to fetch the chart list for.
+
+        Returns:
+            Optional[Responses.ChartRanges]: The UNIX timestamps each week starts and ends at, oldest first.
+        """
+        params = {"method": "user.getweeklychartlist", "user": username}
+        data = await self.api._make_request(params=params)
+
+        if chart_list := data.get("weeklychartlist"):
+            return self._build(
+                Responses.ChartRanges,
+                ranges=[
+                    self._build(
+                        ChartRange,
+                        from_time=int(chart["from"]),
+                        to_time=int(chart["to"]),
+                    )
+                    for chart in chart_list["chart"]
+                ],
+                total=len(chart_list["chart"]),
+            )
+
+    async def get_weekly_charts(
+        self,
+        username: str,
+        kind: str = "artist",
+        from_date: Optional[Union[datetime, date, int]] = None,
+        to_date: Optional[Union[datetime, date, int]] = None,
+        concurrency: int = 4,
+    ) -> Optional["Responses.WeeklyCharts"]:
+        """
+        Fetches every weekly chart of a user over a date range.
+
+        The valid week boundaries are read from `get_weekly_chart_list` and the charts of all the weeks within the range are fetched concurrently.
+        Charts of past weeks never change, so they are cached for long when a cache is configured.
+
+        Args:
+            username (str): The Last.fm username to fetch the charts for.
+            kind (str, optional): "artist", "album" or "track". Defaults to "artist".
+            from_date (datetime.datetime | datetime.date | int, optional): Only weeks starting at or after this time. Defaults to the first week.
+            to_date (datetime.datetime | datetime.date | int, optional): Only weeks ending at or before this time. Defaults to the last week.
+            concurrency (int, optional): The maximum number of charts fetched at once. Defaults to 4.
+
+        Returns:
+            Optional[Responses.WeeklyCharts]: The chart of every week, oldest first.
+        """
+        get_chart = {
+            "artist": self.get_weekly_artist_chart,
+            "album": self.get_weekly_album_chart,
+            "track": self.get_weekly_track_chart,
+        }.get(kind)
+        if get_chart is None:
+            raise ValueError(f"Unknown weekly chart kind: {kind}")
+
+        chart_list = await self.get_weekly_chart_list(username=username)
+        if chart_list is None:
+            return None
+
+        start = to_unix(from_date) if from_date is not None else None
+        end = to_unix(to_date) if to_date is not None else None
+        weeks = [
+            week
+            for week in chart_list.ranges
+            if (start is None or week.from_time >= start)
+            and (end is None or week.to_time <= end)
+        ]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(week: ChartRange):
+            async with semaphore:
+                chart = await get_chart(
+                    username=username, from_date=week.from_time, to_date=week.to_time
+                )
+            return self._build(
+                WeeklyChart, from_time=week.from_time, to_time=week.to_time, chart=chart
+            )
+
+        charts = await asyncio.gather(*map(fetch, weeks))
+        return self._build(Responses.WeeklyCharts, charts=charts, total=len(charts))
+
+    @_timed_parse
     async def get_weekly_artist_chart(
         self,
         username: str,
-        from_date: Optional[datetime] = None,
-        to_date: Optional[datetime] = None,
+        from_date: Optional[Union[datetime, date, int]] = None,
+        to_date: Optional[Union[datetime, date, int]] = None,
     ) -> Optional["Responses.Artists"]:
         """
         Get the Last.fm chart of top artists for a given week.
 
         Args:
             username (str): The Last.fm username to fetch the chart for.
-            from_date (datetime.datetime, optional): The start date of the week.
-            to_date (datetime.datetime, optional): The end date of the week.
+            from_date (datetime.datetime | datetime.date | int, optional): The start of the week, as a datetime (UTC if naive), a date or a UNIX timestamp.
+            to_date (datetime.datetime | datetime.date | int, optional): The end of the week, as a datetime (UTC if naive), a date or a UNIX timestamp.
 
         Returns:
             Optional[APIResponse]: A list of Artist objects representing the top artists, or None if there was an error.
         """
         params = {"method": "user.getweeklyartistchart", "user": username}
         if from_date is not None:
-            params["from"] = from_date.strftime("%Y-%m-%d")
+            params["from"] = to_unix(from_date)
         if to_date is not None:
-            params["to"] = to_date.strftime("%Y-%m-%d")
+            params["to"] = to_unix(to_date)
 
         data = await self.api._make_request(params=params)
 
         if weekly_chart := data.get("weeklyartistchart"):
-            return Responses.Artists(
+            return self._build(
+                Responses.Artists,
                 artists=list(
                     map(
-                        lambda artist: Artist(
-                            name=artist["name"],
-                            playcount=artist["playcount"],
-                            images=get_images_(images=images)
+                        lambda artist: self._build(
+                            Artist,
+                            name=self.api.interner.string(artist["name"]),
+                            playcount=int(artist["playcount"]),
+                            images=self._images(images)
                             if (images := artist.get("image"))
                             else None,
                         ),
@@ -292,19 +823,20 @@ class LastFMUser:
                 total=len(weekly_chart["artist"]),
             )
 
+    @_timed_parse
     async def get_weekly_album_chart(
         self,
         username: str,
-        from_date: Optional[datetime] = None,
-        to_date: Optional[datetime] = None,
+        from_date: Optional[Union[datetime, date, int]] = None,
+        to_date: Optional[Union[datetime, date, int]] = None,
     ) -> Optional["Responses.Albums"]:
         """
         Get the Last.fm chart of top albums for a given week.
 
         Args:
 
-        from_date (datetime.datetime, optional): The datetime for the beginning of the week.
-        to_date (datetime.datetime, optional): The datetime for the end of the week.
+        from_date (datetime.datetime | datetime.date | int, optional): The beginning of the week, as a datetime (UTC if naive), a date or a UNIX timestamp.
+        to_date (datetime.datetime | datetime.date | int, optional): The end of the week, as a datetime (UTC if naive), a date or a UNIX timestamp.
 
         Returns:
         Optional[APIResponse]: A list of Album objects representing the top albums, or None if there was an error.
@@ -314,24 +846,26 @@ class LastFMUser:
             "user": username,
         }
         if from_date:
-            params["from"] = from_date.strftime("%Y-%m-%d")
+            params["from"] = to_unix(from_date)
         if to_date:
-            params["to"] = to_date.strftime("%Y-%m-%d")
+            params["to"] = to_unix(to_date)
 
         data = await self.api._make_request(params=params)
 
         if weekly_chart := data.get("weeklyalbumchart"):
-            return Responses.Albums(
+            return self._build(
+                Responses.Albums,
                 albums=list(
                     map(
-                        lambda album: Album(
-                            artist=album["artist"]["#text"],
-                            title=album["name"],
-                            images=get_images_(images=images)
+                        lambda album: self._build(
+                            Album,
+                            artist=self.api.interner.string(album["artist"]["#text"]),
+                            title=self.api.interner.string(album["name"]),
+                            images=self._images(images)
                             if (images := album.get("image"))
                             else None,
-                            rank=album["@attr"]["rank"],
-                            playcount=album["playcount"],
+                            rank=int(album["@attr"]["rank"]),
+                            playcount=int(album["playcount"]),
                         ),
                         weekly_chart["album"],
                     )
@@ -339,20 +873,23 @@ class LastFMUser:
                 total=len(weekly_chart["album"]),
             )
 
+    @_timed_parse
     async def get_weekly_track_chart(
         self,
         username: str,
-        from_date: Optional[datetime] = None,
-        to_date: Optional[datetime] = None,
-    ) -> Optional["Responses.Tracks"]:
+        from_date: Optional[Union[datetime, date, int]] = None,
+        to_date: Optional[Union[datetime, date, int]] = None,
+        columnar: bool = False,
+    ) -> Optional[Union["Responses.Tracks", "TrackColumns"]]:
         """
         Fetches the weekly track chart for a Last.fm user.
 
         Args:
         username (str): The Last.fm username to fetch weekly track chart for.
-        from_date (datetime.datetime): The date from which to start the weekly chart.
-        to_date (datetime.datetime): The date to which to end the weekly chart.
+        from_date (datetime.datetime | datetime.date | int): The start of the weekly chart, as a datetime (UTC if naive), a date or a UNIX timestamp.
+        to_date (datetime.datetime | datetime.date | int): The end of the weekly chart, as a datetime (UTC if naive), a date or a UNIX timestamp.
         limit (int, optional): The number of results to fetch. Defaults to 50.
+        columnar (bool, optional): Returns the tracks as compact TrackColumns instead of Track objects. Defaults to False.
 
         Returns:
         Optional["APIResponse"]: A list of Track objects representing the weekly track chart, or None if there was an error.
@@ -362,24 +899,105 @@ class LastFMUser:
             "user": username,
         }
         if from_date is not None:
-            params["from"] = from_date.strftime("%Y-%m-%d")
+            params["from"] = to_unix(from_date)
         if to_date is not None:
-            params["to"] = to_date.strftime("%Y-%m-%d")
+            params["to"] = to_unix(to_date)
         data = await self.api._make_request(params=params)
+        if columnar:
+            return self._parse_chart_columns(data.get("weeklytrackchart"))
 
         if weekly_chart := data.get("weeklytrackchart"):
-            return Responses.Tracks(
+            return self._build(
+                Responses.Tracks,
                 tracks=list(
                     map(
-                        lambda track: Track(
-                            artist=track["artist"]["#text"],
-                            title=track["name"],
-                            images=get_images_(track.get("image")),
-                            rank=track["@attr"]["rank"],
-                            playcount=track["playcount"],
+                        lambda track: self._build(
+                            Track,
+                            artist=self.api.interner.string(track["artist"]["#text"]),
+                            title=self.api.interner.string(track["name"]),
+                            images=self._images(track.get("image")),
+                            rank=int(track["@attr"]["rank"]),
+                            playcount=int(track["playcount"]),
                         ),
                         weekly_chart["track"],
                     )
                 ),
                 total=len(weekly_chart["track"]),
             )
+
+    def for_users(
+        self,
+        method: Callable[..., Awaitable[Any]],
+        usernames: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 10,
+        **kwargs,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Calls a method of this class for many users, with bounded concurrency.
+
+        Args:
+        method (Callable): The method to call, e.g. `fm.user.get_info`.
+        usernames (Iterable[str] | AsyncIterable[str]): The Last.fm usernames. Consumed lazily, so it can be a generator.
+        concurrency (int, optional): The maximum number of calls in flight. Defaults to 10.
+        **kwargs: Passed to every call, along with the username.
+
+        Yields:
+        BatchResult: The username and either the value returned or the exception raised, in completion order.
+        """
+        return as_completed(
+            lambda username: method(username=username, **kwargs),
+            usernames,
+            concurrency=concurrency,
+        )
+
+    def get_info_many(
+        self,
+        usernames: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 10,
+    ) -> AsyncIterator[BatchResult]:
+        """Fetches the profile of many users, see `for_users`."""
+        return self.for_users(self.get_info, usernames, concurrency=concurrency)
+
+    def get_recent_tracks_many(
+        self,
+        usernames: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 10,
+        **kwargs,
+    ) -> AsyncIterator[BatchResult]:
+        """Fetches the recent tracks of many users, see `for_users` and `get_recent_tracks`."""
+        return self.for_users(
+            self.get_recent_tracks, usernames, concurrency=concurrency, **kwargs
+        )
+
+    def get_top_artists_many(
+        self,
+        usernames: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 10,
+        **kwargs,
+    ) -> AsyncIterator[BatchResult]:
+        """Fetches the top artists of many users, see `for_users` and `get_top_artists`."""
+        return self.for_users(
+            self.get_top_artists, usernames, concurrency=concurrency, **kwargs
+        )
+
+    def get_top_albums_many(
+        self,
+        usernames: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 10,
+        **kwargs,
+    ) -> AsyncIterator[BatchResult]:
+        """Fetches the top albums of many users, see `for_users` and `get_top_albums`."""
+        return self.for_users(
+            self.get_top_albums, usernames, concurrency=concurrency, **kwargs
+        )
+
+    def get_top_tracks_many(
+        self,
+        usernames: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 10,
+        **kwargs,
+    ) -> AsyncIterator[BatchResult]:
+        """Fetches the top tracks of many users, see `for_users` and `get_top_tracks`."""
+        return self.for_users(
+            self.get_top_tracks, usernames, concurrency=concurrency, **kwargs
+        )
@@ -0,0 +1,150 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List
+
+from asyncfm.api import LastFMAPI
+
+
+class SyncLastFMAPI:
+    """
+    Blocking client for threaded code (WSGI apps, Celery workers, scripts).
+
+    A single `LastFMAPI` runs on an event loop in a background thread, so every
+    thread shares its connection pool, scheduler, cache and rate limit. Calls made
+    through `user` block the calling thread until the result is ready; `submit`
+    and `map` run several calls concurrently.
+
+        with SyncLastFMAPI(api_key="api_key_here") as lastfm:
+            user = lastfm.user.get_info("username")
+            for track in lastfm.user.iter_recent_tracks("username"):
+                ...
+
+    `request_options` blocks set in the calling thread apply to its calls.
+
+    Args:
+        *args, **kwargs: Passed to `LastFMAPI`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="asyncfm", daemon=True
+        )
+        self._thread.start()
+
+        async def create() -> LastFMAPI:
+            return await LastFMAPI(*args, **kwargs).__aenter__()
+
+        try:
+            self.api = self.submit(create).result()
+        except BaseException:
+            self._stop()
+            raise
+        self.user = _BlockingProxy(self, self.api.user)
+
+    def submit(
+        self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> "Future[Any]":
+        """
+        Schedules `fn(*args, **kwargs)` on the client loop, e.g. `submit(lastfm.api.user.get_info, "username")`.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the result of the call.
+        """
+
+        async def call():
+            return await fn(*args, **kwargs)
+
+        return self._run(call())
+
+    def _run(self, awaitable: Awaitable[Any]) -> "Future[Any]":
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("SyncLastFMAPI cannot be called from its own loop")
+
+        async def call():
+            return await awaitable
+
+        return asyncio.run_coroutine_threadsafe(call(), self._loop)
+
+    def map(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        items: Iterable[Any],
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """
+        Calls `fn(item, **kwargs)` for every item concurrently and returns the results in order.
+
+        The calls still go through the scheduler of the client, so they respect its rate limit.
+
+        Args:
+            fn (Callable): A method of `api`, e.g. `lastfm.api.user.get_info`.
+            items (Iterable): The first argument of every call.
+            return_exceptions (bool, optional): Returns the exception of a failed call in its place instead of raising the first one. Defaults to False.
+        """
+        futures = [self.submit(fn, item, **kwargs) for item in items]
+        try:
+            return [
+                future.exception() or future.result()
+                if return_exceptions
+                else future.result()
+                for future in futures
+            ]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def iterate(self, iterator: AsyncIterator[Any]) -> Iterator[Any]:
+        """Iterates over an async iterator of the client, e.g. `lastfm.api.user.iter_top_artists("username")`."""
+        try:
+            while True:
+                try:
+                    yield self.submit(iterator.__anext__).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            if hasattr(iterator, "aclose"):
+                self.submit(iterator.aclose).result()
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self.submit(self.api.close).result()
+        self._stop()
+
+    def _stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _BlockingProxy:
+    """Exposes the methods of an object with blocking calls, and the async iterators they return as iterators."""
+
+    def __init__(self, client: SyncLastFMAPI, target: Any):
+        self._client = client
+        self._target = target
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = attribute(*args, **kwargs)
+            if isinstance(result, AsyncIterator):
+                return self._client.iterate(result)
+            if inspect.isawaitable(result):
+                return self._client._run(result).result()
+            return result
+
+        return call
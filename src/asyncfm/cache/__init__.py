@@ -0,0 +1,13 @@
+from .base import CacheBackend, CacheEntry, CachePolicy, cache_key
+from .memory import MemoryCache
+from .sqlite import SQLiteCache
+
+
+__all__ = [
+    "CacheBackend",
+    "CacheEntry",
+    "CachePolicy",
+    "MemoryCache",
+    "SQLiteCache",
+    "cache_key",
+]
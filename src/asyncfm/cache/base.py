@@ -0,0 +1,132 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from asyncfm.utils import request_key
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    return urlencode(request_key(params))
+
+
+class CacheEntry(NamedTuple):
+    value: Dict[str, Any]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+
+class CacheBackend(ABC):
+    """
+    Storage for decoded API responses.
+
+    Subclasses implement `_get`, `set`, `delete` and `clear`; hit and miss counters
+    are kept here so every backend reports them the same way. Entries are kept
+    for `stale_ttl` seconds past their expiry and returned as stale so they can be
+    served while being refreshed.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = await self._get(key)
+        if entry is None:
+            self.misses += 1
+        elif entry.fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    async def set(
+        self, key: str, value: Dict[str, Any], ttl: float, stale_ttl: float = 0
+    ):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+
+class CachePolicy:
+    """
+    Decides for how long (in seconds) the response to a request is cached.
+
+    Endpoints taking a `period` are cached according to `period_ttls`, every other
+    method according to `ttls`. Methods missing from both fall back to `default_ttl`;
+    a TTL of 0 or None disables caching for that request. Weekly charts of weeks
+    that are over never change and are cached for `closed_chart_ttl`. Expired responses are
+    still served for `stale_ttl` seconds while a fresh copy is fetched in the
+    background.
+    """
+
+    WEEKLY_CHARTS = {
+        "user.getweeklyartistchart",
+        "user.getweeklyalbumchart",
+        "user.getweeklytrackchart",
+    }
+    TTLS = {
+        "user.getinfo": 300,
+        "user.getrecenttracks": 15,
+        "user.gettoptags": 3600,
+        "user.getweeklychartlist": 3600,
+        "user.getweeklyartistchart": 3600,
+        "user.getweeklyalbumchart": 3600,
+        "user.getweeklytrackchart": 3600,
+    }
+    PERIOD_TTLS = {
+        "7day": 600,
+        "1month": 1800,
+        "3month": 3600,
+        "6month": 3600,
+        "12month": 6 * 3600,
+        "overall": 6 * 3600,
+    }
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        period_ttls: Optional[Dict[str, float]] = None,
+        default_ttl: Optional[float] = 300,
+        stale_ttl: float = 0,
+        closed_chart_ttl: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.ttls = {**self.TTLS, **(ttls or {})}
+        self.period_ttls = {**self.PERIOD_TTLS, **(period_ttls or {})}
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.closed_chart_ttl = closed_chart_ttl
+
+    def ttl_for(self, params: Dict[str, Any]) -> Optional[float]:
+        method = params.get("method")
+        if (
+            method in self.WEEKLY_CHARTS
+            and "to" in params
+            and int(params["to"]) < time.time()
+        ):
+            return self.closed_chart_ttl
+        if method in self.ttls:
+            return self.ttls[method]
+        if (period := params.get("period")) in self.period_ttls:
+            return self.period_ttls[period]
+        return self.default_ttl
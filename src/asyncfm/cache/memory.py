@@ -0,0 +1,68 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from asyncfm.cache.base import CacheBackend, CacheEntry
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache.
+
+    Args:
+        max_entries (int, optional): Maximum number of cached responses. Defaults to 1024.
+        max_bytes (int, optional): Maximum total size of the cached responses, measured as JSON. Defaults to no limit.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[CacheEntry, float, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _get(self, key: str) -> Optional[CacheEntry]:
+        if (stored := self._entries.get(key)) is None:
+            return None
+
+        entry, stale_until, _ = stored
+        if stale_until <= time.time():
+            self._pop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(
+        self, key: str, value: Dict[str, Any], ttl: float, stale_ttl: float = 0
+    ):
+        size = len(json.dumps(value)) if self.max_bytes is not None else 0
+        expires_at = time.time() + ttl
+        self._pop(key)
+        self._entries[key] = (
+            CacheEntry(value=value, expires_at=expires_at),
+            expires_at + stale_ttl,
+            size,
+        )
+        self.size += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            self._pop(next(iter(self._entries)))
+
+    async def delete(self, key: str):
+        self._pop(key)
+
+    async def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def _pop(self, key: str):
+        if (entry := self._entries.pop(key, None)) is not None:
+            self.size -= entry[2]
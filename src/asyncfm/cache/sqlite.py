@@ -0,0 +1,175 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from asyncfm.cache.base import CacheBackend, CacheEntry
+from asyncfm.utils import get_json_dumps, get_json_loads
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache shared by every process pointing at the same file.
+
+    Responses are stored as JSON in a SQLite database in WAL mode, so readers never
+    block each other and writers from several processes are serialized by SQLite
+    itself. They are encoded and decoded with orjson or msgspec when installed. Once the stored responses exceed `max_bytes`, the least recently used
+    ones are evicted. Database calls run in a worker thread to keep the event loop free.
+
+    Args:
+        path (str): Path of the database file, created if missing.
+        max_bytes (int, optional): Maximum total size of the stored responses. Defaults to 256 MiB.
+        busy_timeout (float, optional): Seconds to wait for a lock held by another process. Defaults to 5.
+        json_loads (Callable[[bytes], Any], optional): Decoder of the stored responses. Defaults to the fastest available.
+        json_dumps (Callable[[Any], bytes], optional): Encoder of the stored responses. Defaults to the fastest available.
+    """
+
+    # access times are only written back when older than this, to limit write contention
+    TOUCH_INTERVAL = 60
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        busy_timeout: float = 5.0,
+        json_loads: "Optional[Callable[[bytes], Any]]" = None,
+        json_dumps: "Optional[Callable[[Any], bytes]]" = None,
+    ):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self.json_loads = json_loads or get_json_loads()
+        self.json_dumps = json_dumps or get_json_dumps()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # bytes written since the last size check
+        self._written = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    stale_until REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at"
+                " ON responses (accessed_at)"
+            )
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, fn, *args):
+        def call():
+            with self._lock:
+                return fn(self._connect(), *args)
+
+        return await asyncio.to_thread(call)
+
+    async def _get(self, key: str) -> Optional[CacheEntry]:
+        return await self._run(self._select, key)
+
+    def _select(self, connection: sqlite3.Connection, key: str):
+        row = connection.execute(
+            "SELECT value, expires_at, stale_until, accessed_at"
+            " FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at, stale_until, accessed_at = row
+        now = time.time()
+        if stale_until <= now:
+            connection.execute(
+                "DELETE FROM responses WHERE key = ? AND stale_until <= ?", (key, now)
+            )
+            return None
+        if accessed_at < now - self.TOUCH_INTERVAL:
+            connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return CacheEntry(value=self.json_loads(value), expires_at=expires_at)
+
+    async def set(
+        self, key: str, value: Dict[str, Any], ttl: float, stale_ttl: float = 0
+    ):
+        await self._run(self._insert, key, self.json_dumps(value), ttl, stale_ttl)
+
+    def _insert(
+        self,
+        connection: sqlite3.Connection,
+        key: str,
+        value: bytes,
+        ttl: float,
+        stale_ttl: float,
+    ):
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, value, now + ttl, now + ttl + stale_ttl, now, len(value)),
+        )
+
+        self._written += len(value)
+        if self._written > self.max_bytes // 16:
+            self._written = 0
+            self._evict(connection, now)
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM responses WHERE stale_until <= ?", (now,))
+            (size,) = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            if size > self.max_bytes:
+                # drop the least recently used responses until back under the cap
+                connection.execute(
+                    """
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, size, SUM(size) OVER (
+                                ORDER BY accessed_at, key
+                            ) AS freed FROM responses
+                        ) WHERE freed - size < ?
+                    )
+                    """,
+                    (size - self.max_bytes,),
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    async def delete(self, key: str):
+        await self._run(
+            lambda connection: connection.execute(
+                "DELETE FROM responses WHERE key = ?", (key,)
+            )
+        )
+
+    async def clear(self):
+        await self._run(lambda connection: connection.execute("DELETE FROM responses"))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
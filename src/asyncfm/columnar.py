@@ -0,0 +1,189 @@
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from asyncfm.types import Track
+
+NOW_PLAYING = 1
+LOVED = 2
+
+
+class StringTable:
+    """Interned strings, stored once and referenced by index. -1 stands for None."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        return None if index < 0 else self.strings[index]
+
+    def index(self, value: str) -> Optional[int]:
+        """The index of `value`, None if it was never added."""
+        return self._index.get(value)
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        if (index := self._index.get(value)) is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+class TrackRow(NamedTuple):
+    artist: str
+    title: str
+    album: Optional[str]
+    timestamp: Optional[int]
+    now_playing: bool
+    loved: bool
+    rank: Optional[int]
+    playcount: Optional[int]
+
+
+class TrackColumns:
+    """
+    Compact, column-oriented list of tracks.
+
+    Artist, title and album names are interned in a shared `StringTable` and stored
+    as int32 indexes next to int64 timestamps, int32 ranks and play counts, and one
+    byte of now playing / loved flags per track. That is a few dozen bytes per track
+    instead of a `Track` model with its `Image`. Rows are materialized on access.
+    """
+
+    def __init__(
+        self,
+        strings: Optional[StringTable] = None,
+        total: Optional[int] = None,
+        page: Optional[int] = None,
+        total_pages: Optional[int] = None,
+    ):
+        self.strings = strings if strings is not None else StringTable()
+        self.artists = array("i")
+        self.titles = array("i")
+        self.albums = array("i")
+        # 0 when unknown, e.g. the track being played now
+        self.timestamps = array("q")
+        # 0 when unknown, e.g. for recent tracks
+        self.ranks = array("i")
+        self.playcounts = array("i")
+        self.flags = bytearray()
+        self.total = total
+        self.page = page
+        self.total_pages = total_pages
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __getitem__(self, index: int) -> TrackRow:
+        strings, flags = self.strings, self.flags[index]
+        return TrackRow(
+            artist=strings[self.artists[index]],
+            title=strings[self.titles[index]],
+            album=strings[self.albums[index]],
+            timestamp=self.timestamps[index] or None,
+            now_playing=bool(flags & NOW_PLAYING),
+            loved=bool(flags & LOVED),
+            rank=self.ranks[index] or None,
+            playcount=self.playcounts[index] or None,
+        )
+
+    def __iter__(self) -> Iterator[TrackRow]:
+        return (self[index] for index in range(len(self)))
+
+    def append(
+        self,
+        artist: str,
+        title: str,
+        album: Optional[str] = None,
+        timestamp: Optional[int] = None,
+        now_playing: bool = False,
+        loved: bool = False,
+        rank: Optional[int] = None,
+        playcount: Optional[int] = None,
+    ):
+        add = self.strings.add
+        self.artists.append(add(artist))
+        self.titles.append(add(title))
+        self.albums.append(add(album))
+        self.timestamps.append(timestamp or 0)
+        self.ranks.append(rank or 0)
+        self.playcounts.append(playcount or 0)
+        self.flags.append((NOW_PLAYING if now_playing else 0) | (LOVED if loved else 0))
+
+    def extend(self, other: "TrackColumns"):
+        """Appends the tracks of another page, re-indexing its strings if needed."""
+        if other.strings is self.strings:
+            self.artists.extend(other.artists)
+            self.titles.extend(other.titles)
+            self.albums.extend(other.albums)
+        else:
+            remap = [self.strings.add(value) for value in other.strings.strings]
+            for column, source in (
+                (self.artists, other.artists),
+                (self.titles, other.titles),
+                (self.albums, other.albums),
+            ):
+                column.extend(remap[index] if index >= 0 else -1 for index in source)
+        self.timestamps.extend(other.timestamps)
+        self.ranks.extend(other.ranks)
+        self.playcounts.extend(other.playcounts)
+        self.flags.extend(other.flags)
+
+    def nbytes(self) -> int:
+        """Size of the columns, without the string table."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (
+                self.artists,
+                self.titles,
+                self.albums,
+                self.timestamps,
+                self.ranks,
+                self.playcounts,
+            )
+        ) + len(self.flags)
+
+    def to_tracks(self) -> List[Track]:
+        return [
+            Track(
+                artist=row.artist,
+                title=row.title,
+                album=row.album,
+                images=None,
+                now_playing=row.now_playing,
+                rank=row.rank,
+                playcount=row.playcount,
+                timestamp=row.timestamp,
+                loved=row.loved,
+            )
+            for row in self
+        ]
+
+    def to_numpy(self) -> Dict[str, "numpy.ndarray"]:
+        """
+        Zero-copy NumPy views of the columns. String columns hold indexes into
+        `strings`, exported as an object array under the "strings" key.
+
+        The columns cannot grow while the views are alive.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("TrackColumns.to_numpy requires numpy") from None
+
+        flags = numpy.frombuffer(self.flags, dtype=numpy.uint8)
+        return {
+            "artist": numpy.frombuffer(self.artists, dtype=numpy.int32),
+            "title": numpy.frombuffer(self.titles, dtype=numpy.int32),
+            "album": numpy.frombuffer(self.albums, dtype=numpy.int32),
+            "timestamp": numpy.frombuffer(self.timestamps, dtype=numpy.int64),
+            "rank": numpy.frombuffer(self.ranks, dtype=numpy.int32),
+            "playcount": numpy.frombuffer(self.playcounts, dtype=numpy.int32),
+            "now_playing": (flags & NOW_PLAYING).astype(bool),
+            "loved": (flags & LOVED).astype(bool),
+            "strings": numpy.array(self.strings.strings, dtype=object),
+        }
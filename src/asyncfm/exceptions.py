@@ -1,3 +1,6 @@
+import asyncio
+
+
 class FMError(Exception):
     def __init__(self, code: int, message: str):
         self.code = code
@@ -113,6 +116,36 @@ class DeprecatedError(FMError):
     pass
 
 
+class RateLimitExceededError(FMError):
+    pass
+
+
+class HTTPError(FMError):
+    """Error response without a Last.fm error document, e.g. an HTML error page. `code` is the HTTP status."""
+
+
+class ServerError(HTTPError):
+    pass
+
+
+class CircuitOpenError(FMError):
+    """Raised without contacting Last.fm while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            code=None, message=f"Circuit open, retry in {retry_after:.1f} seconds"
+        )
+
+
+class DeadlineExceededError(FMError, asyncio.TimeoutError):
+    """Raised when a call takes longer than its timeout, queueing and retries included."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        super().__init__(code=None, message=f"Deadline of {timeout} seconds exceeded")
+
+
 def get_error(code: int):
     ERRORS = {
         1: Error,
@@ -142,5 +175,6 @@ def get_error(code: int):
         25: RadioNotFoundError,
         26: APIKeySuspendedError,
         27: DeprecatedError,
+        29: RateLimitExceededError,
     }
     return ERRORS.get(code, FMError)
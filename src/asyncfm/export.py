@@ -0,0 +1,150 @@
+import asyncio
+import bz2
+import gzip
+import lzma
+import time
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from asyncfm import api
+from asyncfm.api.pagination import iter_pages
+from asyncfm.api.user import MAX_RECENT_TRACKS_LIMIT
+from asyncfm.utils import get_json_dumps, to_int
+
+_OPENERS = {None: open, "gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+class NDJSONWriter:
+    """Writes every track as it was returned by the API, one JSON document per line."""
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        if compression not in _OPENERS:
+            raise ValueError(f"Unsupported compression for NDJSON: {compression}")
+
+        self._file: BinaryIO = _OPENERS[compression](path, "wb")
+        self._dumps = get_json_dumps()
+
+    def write(self, tracks: List[Dict[str, Any]]):
+        dumps = self._dumps
+        self._file.write(b"".join(dumps(track) + b"\n" for track in tracks))
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Writes the scrobbles as a Parquet file, one row group per page. Requires pyarrow.
+
+    Args:
+        compression (str, optional): Any codec supported by pyarrow, e.g. "zstd" or "snappy". Defaults to no compression.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow") from None
+
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema(
+            [
+                ("timestamp", pyarrow.int64()),
+                ("artist", pyarrow.string()),
+                ("title", pyarrow.string()),
+                ("album", pyarrow.string()),
+                ("loved", pyarrow.bool_()),
+                ("mbid", pyarrow.string()),
+                ("artist_mbid", pyarrow.string()),
+                ("album_mbid", pyarrow.string()),
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(
+            path, self._schema, compression=compression or "none"
+        )
+
+    def write(self, tracks: List[Dict[str, Any]]):
+        columns = {name: [] for name in self._schema.names}
+        for track in tracks:
+            artist, album = track["artist"], track["album"]
+            columns["timestamp"].append(int(track["date"]["uts"]))
+            columns["artist"].append(artist.get("#text") or artist.get("name"))
+            columns["title"].append(track["name"])
+            columns["album"].append(album.get("#text") or None)
+            columns["loved"].append(track["loved"] == "1" if "loved" in track else None)
+            columns["mbid"].append(track.get("mbid") or None)
+            columns["artist_mbid"].append(artist.get("mbid") or None)
+            columns["album_mbid"].append(album.get("mbid") or None)
+        self._writer.write_table(self._pyarrow.table(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {"ndjson": NDJSONWriter, "parquet": ParquetWriter}
+
+
+async def export_recent_tracks(
+    api: "api.LastFMAPI",
+    username: str,
+    path: str,
+    format: str = "ndjson",
+    compression: Optional[str] = None,
+    extended: bool = True,
+    from_time: Optional[int] = None,
+    to_time: Optional[int] = None,
+    window: int = 4,
+) -> int:
+    """
+    Streams the listening history of a Last.fm user to a file.
+
+    Pages go from the HTTP layer to the file without being turned into models or
+    cached, and at most `window` of them are held at once, so memory stays flat no
+    matter how long the history is. Writing happens in a worker thread while the
+    next pages download. The track being played now is left out.
+
+    Args:
+        api (LastFMAPI): The client to fetch the scrobbles with.
+        username (str): The Last.fm username to export.
+        path (str): The file to write to.
+        format (str, optional): "ndjson" (raw API tracks, one per line) or "parquet". Defaults to "ndjson".
+        compression (str, optional): "gzip", "bz2" or "xz" for NDJSON, a pyarrow codec for Parquet. Defaults to no compression.
+        extended (bool, optional): Includes the loved flag and extended artist data. Defaults to True.
+        from_time (int, optional): Only export scrobbles after this UNIX timestamp.
+        to_time (int, optional): Only export scrobbles before this UNIX timestamp. Defaults to the current time.
+        window (int, optional): The number of pages fetched concurrently. Defaults to 4.
+
+    Returns:
+        int: The number of scrobbles written.
+    """
+    if format not in WRITERS:
+        raise ValueError(f"Unsupported export format: {format}")
+
+    params = {
+        "method": "user.getrecenttracks",
+        "user": username,
+        "limit": MAX_RECENT_TRACKS_LIMIT,
+        "extended": 1 if extended else 0,
+        "to": to_time if to_time is not None else int(time.time()),
+    }
+    if from_time is not None:
+        params["from"] = from_time
+
+    async def fetch(page: int):
+        data = await api._make_request(params={**params, "page": page}, cache=False)
+        return data.get("recenttracks") or {}
+
+    writer = await asyncio.to_thread(WRITERS[format], path, compression)
+    written = 0
+    try:
+        async for page in iter_pages(
+            fetch,
+            lambda page: to_int(page.get("@attr", {}).get("totalPages")),
+            window=window,
+        ):
+            tracks = [track for track in page.get("track", []) if "date" in track]
+            await asyncio.to_thread(writer.write, tracks)
+            written += len(tracks)
+    finally:
+        await asyncio.to_thread(writer.close)
+    return written
@@ -0,0 +1,282 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from asyncfm import api
+from asyncfm.columnar import TrackColumns
+from asyncfm.types import Track
+
+
+class SyncState(NamedTuple):
+    # newest scrobble stored for the user
+    high_water: Optional[int] = None
+    # range and next page of the run in progress, None when there is none
+    run_from: Optional[int] = None
+    run_to: Optional[int] = None
+    next_page: Optional[int] = None
+
+
+class ScrobbleStore:
+    """
+    Local SQLite copy of the listening histories of any number of users.
+
+    Scrobbles are keyed on (user, timestamp, artist, title), so storing the same
+    scrobble twice is a no-op. Next to them, every user has a `SyncState` with the
+    newest timestamp stored and the checkpoint of the sync run in progress, if any.
+
+    Args:
+        path (str): Path of the database file, created if missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS scrobbles (
+                    user TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    artist TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    album TEXT,
+                    loved INTEGER,
+                    mbid TEXT,
+                    artist_mbid TEXT,
+                    album_mbid TEXT,
+                    PRIMARY KEY (user, timestamp, artist, title)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    user TEXT PRIMARY KEY,
+                    high_water INTEGER,
+                    run_from INTEGER,
+                    run_to INTEGER,
+                    next_page INTEGER
+                );
+                """
+            )
+            self._connection = connection
+        return self._connection
+
+    def state(self, user: str) -> SyncState:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT high_water, run_from, run_to, next_page"
+                    " FROM sync_state WHERE user = ?",
+                    (user,),
+                )
+                .fetchone()
+            )
+        return SyncState(*row) if row else SyncState()
+
+    def save(self, user: str, tracks: Iterable[Track], state: SyncState) -> int:
+        """
+        Stores a page of scrobbles together with the state to resume from, atomically.
+        Tracks without a timestamp (the track being played now) are skipped.
+
+        Returns:
+            int: The number of scrobbles that were not stored yet.
+        """
+        rows = [
+            (
+                user,
+                track.timestamp,
+                track.artist,
+                track.title,
+                track.album,
+                track.loved,
+                track.mbid,
+                track.artist_mbid,
+                track.album_mbid,
+            )
+            for track in tracks
+            if track.timestamp is not None
+        ]
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                before = connection.total_changes
+                connection.executemany(
+                    "INSERT OR IGNORE INTO scrobbles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                inserted = connection.total_changes - before
+                connection.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?)",
+                    (user, *state),
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def count(self, user: str) -> int:
+        with self._lock:
+            (count,) = (
+                self._connect()
+                .execute("SELECT COUNT(*) FROM scrobbles WHERE user = ?", (user,))
+                .fetchone()
+            )
+        return count
+
+    def scrobbles(
+        self,
+        user: str,
+        from_time: Optional[int] = None,
+        to_time: Optional[int] = None,
+    ) -> Iterator[Track]:
+        """Stored scrobbles of a user between two UNIX timestamps (inclusive), newest first."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT timestamp, artist, title, album, loved, mbid, artist_mbid,"
+                    " album_mbid FROM scrobbles WHERE user = ? AND timestamp BETWEEN ? AND ?"
+                    " ORDER BY timestamp DESC",
+                    (
+                        user,
+                        from_time if from_time is not None else 0,
+                        to_time if to_time is not None else 2**63 - 1,
+                    ),
+                )
+                .fetchall()
+            )
+        for (
+            timestamp,
+            artist,
+            title,
+            album,
+            loved,
+            mbid,
+            artist_mbid,
+            album_mbid,
+        ) in rows:
+            yield Track(
+                artist=artist,
+                title=title,
+                album=album,
+                images=None,
+                timestamp=timestamp,
+                loved=None if loved is None else bool(loved),
+                mbid=mbid,
+                artist_mbid=artist_mbid,
+                album_mbid=album_mbid,
+            )
+
+    def load_columns(
+        self,
+        user: str,
+        from_time: Optional[int] = None,
+        to_time: Optional[int] = None,
+    ) -> TrackColumns:
+        """Stored scrobbles of a user between two UNIX timestamps (inclusive) as TrackColumns, oldest first."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT timestamp, artist, title, album, loved FROM scrobbles"
+                    " WHERE user = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp",
+                    (
+                        user,
+                        from_time if from_time is not None else 0,
+                        to_time if to_time is not None else 2**63 - 1,
+                    ),
+                )
+                .fetchall()
+            )
+        columns = TrackColumns(total=len(rows))
+        append = columns.append
+        for timestamp, artist, title, album, loved in rows:
+            # scrobbles without an album are stored with ""
+            append(artist, title, album or None, timestamp=timestamp, loved=bool(loved))
+        return columns
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class HistorySync:
+    """
+    Keeps a `ScrobbleStore` up to date with Last.fm.
+
+    The first run backfills the whole history. Later runs only request scrobbles
+    from the newest stored timestamp on, so their cost depends on the number of new
+    plays. That timestamp is requested again, and scrobbles already stored are
+    skipped, so plays sharing the boundary timestamp are not lost.
+
+    Every run reads a fixed time range. After each page, its scrobbles and the
+    next page to read are committed together, so an interrupted run resumes from
+    the page after the last one stored.
+
+    Args:
+        api (LastFMAPI): The client to fetch the scrobbles with.
+        store (ScrobbleStore): Where to keep them.
+        extended (bool, optional): Also store whether each track is loved. Defaults to True.
+        window (int, optional): The number of pages fetched concurrently. Defaults to 4.
+    """
+
+    def __init__(
+        self,
+        api: "api.LastFMAPI",
+        store: ScrobbleStore,
+        extended: bool = True,
+        window: int = 4,
+    ):
+        self.api = api
+        self.store = store
+        self.extended = extended
+        self.window = window
+
+    async def sync(self, username: str) -> int:
+        """
+        Fetches the scrobbles of a user that are not stored yet.
+
+        Returns:
+            int: The number of new scrobbles stored.
+        """
+        state = await asyncio.to_thread(self.store.state, username)
+        if state.run_to is None:
+            state = state._replace(
+                run_from=state.high_water, run_to=int(time.time()), next_page=1
+            )
+
+        high_water, inserted = state.high_water, 0
+        async for page in self.api.user.iter_recent_track_pages(
+            username=username,
+            extended=self.extended,
+            from_time=state.run_from,
+            to_time=state.run_to,
+            first_page=state.next_page,
+            window=self.window,
+        ):
+            timestamps = [
+                track.timestamp for track in page.tracks if track.timestamp is not None
+            ]
+            high_water = max(timestamps + [high_water or 0]) or None
+            last_page = page.page >= (page.total_pages or 0)
+            checkpoint = (
+                SyncState(high_water=high_water)
+                if last_page
+                else state._replace(high_water=high_water, next_page=page.page + 1)
+            )
+            inserted += await asyncio.to_thread(
+                self.store.save, username, page.tracks, checkpoint
+            )
+        return inserted
@@ -0,0 +1,386 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from aiohttp import web
+
+WEEK = 7 * 24 * 3600
+IMAGE_SIZES = ("small", "medium", "large", "extralarge")
+
+
+class FakeLastFM:
+    """
+    Local stand-in for `ws.audioscrobbler.com/2.0/`, for tests and benchmarks.
+
+    Every `user.*` method the client uses is served from a synthetic history of
+    `scrobbles` plays per user, with the same documents, pagination and error
+    responses as Last.fm, or from recorded `fixtures`. Latency, errors, outages and
+    per-key rate limiting can be injected.
+
+        async with FakeLastFM(latency=0.05) as fake:
+            lastfm = LastFMAPI(api_key="key", base_url=fake.url)
+
+    Args:
+        scrobbles (int, optional): Number of plays in the history of every user. Defaults to 1000.
+        latency (float | Callable[[], float], optional): Seconds added to every response, or a function returning them. Defaults to 0.
+        rate_limit (float, optional): Requests per second allowed per API key before error 29. Defaults to no limit.
+        fixtures (Dict[str, dict], optional): Documents to answer some methods with, by method name.
+        unknown_users (Iterable[str], optional): Users answered with error 6, "User not found".
+        start (int, optional): UNIX timestamp of the first scrobble. Defaults to 2023-11-14.
+        seed (int, optional): Seed of the random latency functions built with `jitter`. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        scrobbles: int = 1000,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        rate_limit: Optional[float] = None,
+        fixtures: "Optional[Dict[str, Dict[str, Any]]]" = None,
+        unknown_users: Iterable[str] = (),
+        start: int = 1_700_000_000,
+        seed: int = 0,
+    ):
+        self.scrobbles = scrobbles
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.fixtures = fixtures or {}
+        self.unknown_users = set(unknown_users)
+        self.start_time = start
+        self.random = random.Random(seed)
+        self.requests: "Counter[str]" = Counter()
+        self.suspended_keys = set()
+        self._errors: "List[Dict[str, Any]]" = []
+        self._buckets: "Dict[str, Tuple[float, float]]" = {}
+        self._runner: "Optional[web.AppRunner]" = None
+        self.url: Optional[str] = None
+
+        self._methods = {
+            "user.getinfo": self._info,
+            "user.getrecenttracks": self._recent_tracks,
+            "user.gettopartists": lambda query: self._top(query, "artist"),
+            "user.gettopalbums": lambda query: self._top(query, "album"),
+            "user.gettoptracks": lambda query: self._top(query, "track"),
+            "user.gettoptags": self._top_tags,
+            "user.getweeklychartlist": self._weekly_chart_list,
+            "user.getweeklyartistchart": lambda query: self._weekly(query, "artist"),
+            "user.getweeklyalbumchart": lambda query: self._weekly(query, "album"),
+            "user.getweeklytrackchart": lambda query: self._weekly(query, "track"),
+        }
+
+    def jitter(
+        self, latency: float, slow: float = 0.0, slow_ratio: float = 0.0
+    ) -> Callable[[], float]:
+        """A latency function: `latency` seconds, or `slow` seconds for a `slow_ratio` share of the responses."""
+        return lambda: slow if self.random.random() < slow_ratio else latency
+
+    def inject_error(
+        self,
+        code: int,
+        times: Optional[int] = None,
+        method: Optional[str] = None,
+        status: int = 500,
+        html: bool = False,
+        page: Optional[int] = None,
+    ):
+        """
+        Answers the next `times` requests (all of them if None), or those of `method`, with an error.
+
+        Args:
+            code (int): The Last.fm error code.
+            page (int, optional): Only fails the requests for this page.
+            status (int, optional): The HTTP status. Defaults to 500.
+            html (bool, optional): Answers with an HTML page instead of a Last.fm error document, like a failing proxy.
+        """
+        self._errors.append(
+            {
+                "code": code,
+                "times": times,
+                "method": method,
+                "status": status,
+                "html": html,
+                "page": page,
+            }
+        )
+
+    def clear_errors(self):
+        self._errors.clear()
+
+    def suspend_key(self, api_key: str):
+        self.suspended_keys.add(api_key)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/2.0/", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/2.0/"
+        return self.url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        query = request.query
+        method = query.get("method", "")
+        self.requests[method] += 1
+
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+
+        if (error := self._next_error(method, query.get("page"))) is not None:
+            if error["html"]:
+                return web.Response(
+                    status=error["status"],
+                    text="<html><body><h1>Service Unavailable</h1></body></html>",
+                    content_type="text/html",
+                )
+            return _error(error["code"], "Injected error", error["status"])
+
+        api_key = query.get("api_key", "")
+        if api_key in self.suspended_keys:
+            return _error(26, "Suspended API key", 403)
+        if self.rate_limit and not self._take_token(api_key):
+            return _error(29, "Rate Limit Exceeded", 429)
+
+        handler = self._methods.get(method)
+        if handler is None:
+            return _error(
+                3, "Invalid Method - No method with that name in this package"
+            )
+        if query.get("user") in self.unknown_users:
+            return _error(6, "User not found", 404)
+        if method in self.fixtures:
+            return web.json_response(self.fixtures[method])
+        return web.json_response(handler(query))
+
+    def _next_error(
+        self, method: str, page: Optional[str]
+    ) -> "Optional[Dict[str, Any]]":
+        for error in self._errors:
+            if error["method"] not in (None, method):
+                continue
+            if error["page"] is not None and str(error["page"]) != (page or "1"):
+                continue
+            if error["times"] is not None:
+                error["times"] -= 1
+                if error["times"] <= 0:
+                    self._errors.remove(error)
+            return error
+        return None
+
+    def _take_token(self, api_key: str) -> bool:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(api_key, (self.rate_limit, now))
+        tokens = min(self.rate_limit, tokens + (now - updated) * self.rate_limit)
+        if tokens < 1:
+            self._buckets[api_key] = (tokens, now)
+            return False
+        self._buckets[api_key] = (tokens - 1, now)
+        return True
+
+    def _timestamps(self, query) -> range:
+        """Timestamps of the plays within the `from`/`to` range of a query, newest first."""
+        low = max(int(query.get("from", 0)), self.start_time)
+        high = min(int(query.get("to", 2**62)), self.start_time + self.scrobbles - 1)
+        # one play per second, so a range maps to consecutive plays
+        return range(high, low - 1, -1)
+
+    def _info(self, query) -> Dict[str, Any]:
+        return {
+            "user": {
+                "name": query["user"],
+                "age": "0",
+                "subscriber": "0",
+                "realname": "",
+                "bootstrap": "0",
+                "playcount": str(self.scrobbles),
+                "artist_count": "40",
+                "playlists": "0",
+                "track_count": "500",
+                "album_count": "60",
+                "image": _images(f"user/{query['user']}"),
+                "registered": {
+                    "unixtime": str(self.start_time),
+                    "#text": self.start_time,
+                },
+                "country": "None",
+                "gender": "n",
+                "url": f"https://www.last.fm/user/{query['user']}",
+                "type": "user",
+            }
+        }
+
+    def _recent_tracks(self, query) -> Dict[str, Any]:
+        limit, page = int(query.get("limit", 50)), int(query.get("page", 1))
+        extended = query.get("extended") == "1"
+        timestamps = self._timestamps(query)
+        tracks = [
+            self._scrobble(timestamp, extended)
+            for timestamp in timestamps[(page - 1) * limit : page * limit]
+        ]
+        if page == 1 and "to" not in query:
+            now_playing = self._scrobble(self.start_time + self.scrobbles, extended)
+            del now_playing["date"]
+            now_playing["@attr"] = {"nowplaying": "true"}
+            tracks.insert(0, now_playing)
+        return {
+            "recenttracks": {
+                "track": tracks,
+                "@attr": _attr(query["user"], page, limit, len(timestamps)),
+            }
+        }
+
+    def _scrobble(self, timestamp: int, extended: bool) -> Dict[str, Any]:
+        index = timestamp - self.start_time
+        artist = f"Artist {index % 40}"
+        track = {
+            "artist": (
+                {"url": _url(artist), "name": artist, "image": _images(artist)}
+                if extended
+                else {"#text": artist}
+            ),
+            "streamable": "0",
+            "image": _images(f"album/{index % 60}"),
+            "mbid": "",
+            "album": {"mbid": "", "#text": f"Album {index % 60}"},
+            "name": f"Track {index % 500}",
+            "url": _url(artist, f"Track {index % 500}"),
+            "date": {"uts": str(timestamp), "#text": "14 Nov 2023, 22:13"},
+        }
+        track["artist"]["mbid"] = ""
+        if extended:
+            track["loved"] = "1" if index % 7 == 0 else "0"
+        return track
+
+    def _top(self, query, kind: str) -> Dict[str, Any]:
+        limit, page = int(query.get("limit", 50)), int(query.get("page", 1))
+        counts = {"artist": 40, "album": 60, "track": 500}[kind]
+        ranks = range((page - 1) * limit + 1, min(counts, page * limit) + 1)
+        items = []
+        for rank in ranks:
+            name = f"{kind.capitalize()} {rank - 1}"
+            item = {
+                "name": name,
+                "playcount": str(max(1, self.scrobbles // counts - rank)),
+                "mbid": "",
+                "url": _url(name),
+                "image": _images(name),
+                "@attr": {"rank": str(rank)},
+            }
+            if kind != "artist":
+                item["artist"] = {
+                    "name": f"Artist {rank % 40}",
+                    "mbid": "",
+                    "url": _url(f"Artist {rank % 40}"),
+                }
+            items.append(item)
+        return {
+            f"top{kind}s": {
+                kind: items,
+                "@attr": _attr(query["user"], page, limit, counts),
+            }
+        }
+
+    def _top_tags(self, query) -> Dict[str, Any]:
+        limit = int(query.get("limit", 50))
+        return {
+            "toptags": {
+                "tag": [
+                    {
+                        "name": f"tag {index}",
+                        "count": 100 - index,
+                        "url": f"https://www.last.fm/tag/tag+{index}",
+                    }
+                    for index in range(min(limit, 20))
+                ],
+                "@attr": {"user": query["user"]},
+            }
+        }
+
+    def _weekly_chart_list(self, query) -> Dict[str, Any]:
+        weeks = range(self.start_time, self.start_time + self.scrobbles, WEEK)
+        return {
+            "weeklychartlist": {
+                "chart": [
+                    {"#text": "", "from": str(week), "to": str(week + WEEK)}
+                    for week in weeks
+                ],
+                "@attr": {"user": query["user"]},
+            }
+        }
+
+    def _weekly(self, query, kind: str) -> Dict[str, Any]:
+        plays = Counter(
+            (timestamp - self.start_time)
+            % {"artist": 40, "album": 60, "track": 500}[kind]
+            for timestamp in self._timestamps(query)
+        )
+        items = []
+        for rank, (index, count) in enumerate(plays.most_common(), start=1):
+            name = f"{kind.capitalize()} {index}"
+            item = {
+                "name": name,
+                "mbid": "",
+                "playcount": str(count),
+                "url": _url(name),
+                "@attr": {"rank": str(rank)},
+            }
+            if kind != "artist":
+                item["artist"] = {"#text": f"Artist {index % 40}", "mbid": ""}
+            if kind == "track":
+                item["image"] = _images(name)
+            items.append(item)
+        return {
+            f"weekly{kind}chart": {
+                kind: items,
+                "@attr": {
+                    "user": query["user"],
+                    "from": query.get("from"),
+                    "to": query.get("to"),
+                },
+            }
+        }
+
+
+def _error(code: int, message: str, status: int = 400) -> web.Response:
+    return web.json_response({"error": code, "message": message}, status=status)
+
+
+def _attr(user: str, page: int, limit: int, total: int) -> Dict[str, str]:
+    return {
+        "user": user,
+        "page": str(page),
+        "perPage": str(limit),
+        "totalPages": str(max(1, -(-total // limit))),
+        "total": str(total),
+    }
+
+
+def _url(artist: str, track: Optional[str] = None) -> str:
+    url = f"https://www.last.fm/music/{artist.replace(' ', '+')}"
+    return f"{url}/_/{track.replace(' ', '+')}" if track else url
+
+
+def _images(name: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "size": size,
+            "#text": f"https://lastfm.freetls.fastly.net/i/u/{size}/{name}.png",
+        }
+        for size in IMAGE_SIZES
+    ]
@@ -1,9 +1,12 @@
-from datetime import datetime
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Dict, Optional, List, Union
 from pydantic import BaseModel, ConfigDict
 
 
 class Image(BaseModel):
+    # shared between every item with the same pictures, see utils.Interner
+    model_config = ConfigDict(frozen=True)
+
     small: str
     medium: str
     large: str
@@ -39,6 +42,18 @@ class Track(BaseModel):
     now_playing: bool = False
     rank: Optional[int] = None
     playcount: Optional[int] = None
+    # scrobble time in UNIX seconds, None for the track being played now
+    timestamp: Optional[int] = None
+    loved: Optional[bool] = None
+    mbid: Optional[str] = None
+    artist_mbid: Optional[str] = None
+    album_mbid: Optional[str] = None
+
+    @property
+    def played_at(self) -> Optional[datetime]:
+        if self.timestamp is None:
+            return None
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
 
 
 class Artist(BaseModel):
@@ -62,19 +77,64 @@ class Tag(BaseModel):
     url: str
 
 
+class ChartRange(BaseModel):
+    from_time: int
+    to_time: int
+
+
 class Responses:
     class Tracks(BaseModel):
         tracks: List[Track]
         total: int
+        page: Optional[int] = None
+        total_pages: Optional[int] = None
 
     class Artists(BaseModel):
         artists: List[Artist]
         total: int
+        page: Optional[int] = None
+        total_pages: Optional[int] = None
 
     class Albums(BaseModel):
         albums: List[Album]
         total: int
+        page: Optional[int] = None
+        total_pages: Optional[int] = None
 
     class Tags(BaseModel):
         tags: List[Tag]
         total: int
+
+    class ChartRanges(BaseModel):
+        ranges: List[ChartRange]
+        total: int
+
+    class WeeklyCharts(BaseModel):
+        charts: List["WeeklyChart"]
+        total: int
+
+
+class WeeklyChart(BaseModel):
+    from_time: int
+    to_time: int
+    chart: Optional[Union[Responses.Artists, Responses.Albums, Responses.Tracks]]
+
+
+Responses.WeeklyCharts.model_rebuild()
+
+
+class ProfileSnapshot(BaseModel):
+    user: Optional[User] = None
+    recent_tracks: Optional[Responses.Tracks] = None
+    top_artists: Optional[Responses.Artists] = None
+    top_albums: Optional[Responses.Albums] = None
+    top_tracks: Optional[Responses.Tracks] = None
+    top_tags: Optional[Responses.Tags] = None
+    # exception raised by each part that could not be fetched, keyed by field name
+    errors: Dict[str, Exception] = {}
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
@@ -1,7 +1,145 @@
-from typing import List, Dict
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Callable, List, Dict, Optional, Type, TypeVar
+from pydantic import BaseModel
 from asyncfm.types import Image
 
+M = TypeVar("M", bound=BaseModel)
+
+_object_setattr = object.__setattr__
+_defaults: Dict[type, Dict[str, Any]] = {}
+
 
 # internt utility
-def get_images_(images: List[Dict]):
-    return Image(**{size["size"]: size["#text"] for size in images if size.get("size")})
+def get_images_(images: List[Dict], construct: bool = False):
+    sizes = {size["size"]: size["#text"] for size in images if size.get("size")}
+    if construct:
+        return construct_model(Image, sizes)
+    return Image(**sizes)
+
+
+class Interner:
+    """
+    Bounded tables of the strings and images seen in responses.
+
+    Histories repeat the same artist and album names and the same picture URLs
+    thousands of times. Looking them up here makes every repetition share one `str`
+    and one immutable `Image`, instead of one copy per item. When a table is full,
+    its oldest entry is dropped.
+
+    Args:
+        max_strings (int, optional): Number of strings kept. Defaults to 100000, 0 disables string interning.
+        max_images (int, optional): Number of images kept. Defaults to 10000, 0 disables image sharing.
+    """
+
+    def __init__(self, max_strings: int = 100_000, max_images: int = 10_000):
+        self.max_strings = max_strings
+        self.max_images = max_images
+        self._strings: Dict[str, str] = {}
+        self._images: Dict[tuple, Image] = {}
+
+    def string(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        if (interned := self._strings.get(value)) is not None:
+            return interned
+        if self.max_strings:
+            if len(self._strings) >= self.max_strings:
+                del self._strings[next(iter(self._strings))]
+            self._strings[value] = value
+        return value
+
+    def image(self, images: List[Dict], construct: bool = False) -> Image:
+        key = tuple((image.get("size"), image["#text"]) for image in images)
+        if (image := self._images.get(key)) is not None:
+            return image
+        image = get_images_(images, construct=construct)
+        if self.max_images:
+            if len(self._images) >= self.max_images:
+                del self._images[next(iter(self._images))]
+            self._images[key] = image
+        return image
+
+
+def construct_model(model: Type[M], fields: Dict[str, Any]) -> M:
+    """
+    Builds a model from trusted, already converted fields, skipping validation.
+
+    Cheaper than `BaseModel.model_construct`, which re-walks every field on each call.
+    """
+    if (defaults := _defaults.get(model)) is None:
+        defaults = _defaults[model] = {
+            name: field.get_default(call_default_factory=True)
+            for name, field in model.model_fields.items()
+        }
+
+    instance = model.__new__(model)
+    _object_setattr(instance, "__dict__", {**defaults, **fields})
+    _object_setattr(instance, "__pydantic_fields_set__", set(fields))
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+def to_int(value: Any) -> Optional[int]:
+    return None if value is None or value == "" else int(value)
+
+
+def to_unix(value: "datetime | date | int") -> int:
+    """UNIX timestamp of a datetime (UTC if naive), of midnight UTC of a date, or of an int as is."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, date):
+        return int(
+            datetime(
+                value.year, value.month, value.day, tzinfo=timezone.utc
+            ).timestamp()
+        )
+    return int(value)
+
+
+def get_json_dumps() -> Callable[[Any], bytes]:
+    """Fastest available JSON encoder returning bytes: orjson, msgspec or the standard library."""
+    try:
+        import orjson
+
+        return orjson.dumps
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        return msgspec.json.encode
+    except ImportError:
+        pass
+    return lambda value: json.dumps(value, ensure_ascii=False).encode()
+
+
+def get_json_loads() -> Callable[[bytes], Any]:
+    """Fastest available JSON decoder accepting bytes: orjson, msgspec or the standard library."""
+    try:
+        import orjson
+
+        return orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        return msgspec.json.decode
+    except ImportError:
+        pass
+    return json.loads
+
+
+def request_key(params: Dict) -> tuple:
+    """Normalized, hashable form of the request params, ignoring the API key and format."""
+    return tuple(
+        sorted(
+            (key, str(value))
+            for key, value in params.items()
+            if key not in ("api_key", "format")
+        )
+    )
@@ -0,0 +1,58 @@
+import json
+import time
+
+from asyncfm.api import LastFMAPI
+from asyncfm.utils import get_json_loads
+
+
+def recent_tracks_page(size: int = 200) -> bytes:
+    images = [
+        {"size": size, "#text": f"https://lastfm.freetls.fastly.net/i/u/{size}.png"}
+        for size in ("small", "medium", "large", "extralarge")
+    ]
+    tracks = [
+        {
+            "artist": {"mbid": "", "#text": f"Artist {i % 40}"},
+            "streamable": "0",
+            "image": images,
+            "mbid": "",
+            "album": {"mbid": "", "#text": f"Album {i % 60}"},
+            "name": f"Track {i}",
+            "url": f"https://www.last.fm/music/Artist+{i % 40}/_/Track+{i}",
+            "date": {"uts": str(1700000000 - i * 180), "#text": "14 Nov 2023, 22:13"},
+        }
+        for i in range(size)
+    ]
+    page = {
+        "recenttracks": {
+            "track": tracks,
+            "@attr": {
+                "user": "rj",
+                "totalPages": "750",
+                "page": "1",
+                "perPage": str(size),
+                "total": "150000",
+            },
+        }
+    }
+    return json.dumps(page).encode()
+
+
+def bench(name: str, fm: LastFMAPI, body: bytes, seconds: float = 2.0):
+    pages = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        fm.user._parse_recent_tracks(fm.json_loads(body))
+        pages += 1
+    print(f"{name:<40} {pages / elapsed:>8.0f} pages/s")
+
+
+if __name__ == "__main__":
+    body = recent_tracks_page()
+    print(f"{len(body)} bytes, 200 tracks per page ({get_json_loads().__module__})")
+
+    bench("json + validation", LastFMAPI("api_key", json_loads=json.loads), body)
+    bench("fastest decoder + validation", LastFMAPI("api_key"), body)
+    bench(
+        "fastest decoder + fast construct", LastFMAPI("api_key", validate=False), body
+    )
@@ -0,0 +1,176 @@
+"""
+Benchmarks of the client against a local FakeLastFM server.
+
+    PYTHONPATH=src python tests/benchmark.py [--latency 0.02] [--json results.json]
+
+For every LastFMUser method: requests per second, p50/p99 latency, parse throughput
+and peak memory, then the same for a paginated crawl of a long history.
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+from statistics import quantiles
+
+from asyncfm.api import LastFMAPI
+from asyncfm.testing import FakeLastFM
+
+METHODS = {
+    "get_info": lambda user: user.get_info("bench"),
+    "get_recent_tracks": lambda user: user.get_recent_tracks(
+        "bench", limit=200, extended=True
+    ),
+    "get_top_artists": lambda user: user.get_top_artists("bench", limit=200),
+    "get_top_albums": lambda user: user.get_top_albums("bench", limit=200),
+    "get_top_tracks": lambda user: user.get_top_tracks("bench", limit=200),
+    "get_top_tags": lambda user: user.get_top_tags("bench"),
+    "get_weekly_chart_list": lambda user: user.get_weekly_chart_list("bench"),
+    "get_weekly_artist_chart": lambda user: user.get_weekly_artist_chart(
+        "bench", from_date=1_700_000_000, to_date=1_700_604_800
+    ),
+    "get_weekly_album_chart": lambda user: user.get_weekly_album_chart(
+        "bench", from_date=1_700_000_000, to_date=1_700_604_800
+    ),
+    "get_weekly_track_chart": lambda user: user.get_weekly_track_chart(
+        "bench", from_date=1_700_000_000, to_date=1_700_604_800
+    ),
+}
+
+
+def client(fake: FakeLastFM, **kwargs) -> LastFMAPI:
+    # no rate limit, no coalescing: every call is a real round trip
+    return LastFMAPI(
+        "bench", base_url=fake.url, rate_limit=None, coalesce=False, **kwargs
+    )
+
+
+async def bench_method(fake: FakeLastFM, name: str, calls: int, concurrency: int):
+    call = METHODS[name]
+    async with client(fake, max_concurrency=concurrency) as lastfm:
+        await call(lastfm.user)  # warm up the connection pool
+        latencies = []
+
+        async def timed():
+            started = time.perf_counter()
+            await call(lastfm.user)
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(timed() for _ in range(calls)))
+        elapsed = time.perf_counter() - started
+
+        # parse only, on a response fetched once
+        data = None
+        original = lastfm._make_request
+
+        async def recorded(params, cache=True):
+            nonlocal data
+            data = await original(params, cache)
+            return data
+
+        lastfm._make_request = recorded
+        await call(lastfm.user)
+
+        async def replay(params, cache=True):
+            return data
+
+        lastfm._make_request = replay
+        parses, parse_started = 0, time.perf_counter()
+        while time.perf_counter() - parse_started < 0.5:
+            await call(lastfm.user)
+            parses += 1
+        parse_rate = parses / (time.perf_counter() - parse_started)
+
+        lastfm._make_request = original
+        tracemalloc.start()
+        await asyncio.gather(*(call(lastfm.user) for _ in range(concurrency)))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    cuts = quantiles(latencies, n=100)
+    return {
+        "requests_per_second": calls / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "parses_per_second": parse_rate,
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+async def bench_crawl(fake: FakeLastFM, window: int):
+    async def crawl() -> int:
+        async with client(fake, max_concurrency=window) as lastfm:
+            tracks = 0
+            async for _ in lastfm.user.iter_recent_tracks("bench", window=window):
+                tracks += 1
+            return tracks
+
+    started = time.perf_counter()
+    tracks = await crawl()
+    elapsed = time.perf_counter() - started
+
+    # tracing slows everything down, so memory is measured on a second run
+    tracemalloc.start()
+    await crawl()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "tracks": tracks,
+        "tracks_per_second": tracks / elapsed,
+        "pages_per_second": -(-tracks // 200) / elapsed,
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def serve_in_thread(fake: FakeLastFM) -> asyncio.AbstractEventLoop:
+    """Runs the fake server on its own event loop, so its work is not timed as the client's."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(fake.start(), loop).result()
+    return loop
+
+
+async def main(args: argparse.Namespace):
+    results = {}
+    fake = FakeLastFM(scrobbles=args.scrobbles, latency=args.latency)
+    loop = serve_in_thread(fake)
+    try:
+        print(
+            f"{'method':<24} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'parse/s':>9} {'peak KiB':>9}"
+        )
+        for name in METHODS:
+            result = results[name] = await bench_method(
+                fake, name, args.calls, args.concurrency
+            )
+            print(
+                f"{name:<24} {result['requests_per_second']:>8.0f} {result['p50_ms']:>8.1f}"
+                f" {result['p99_ms']:>8.1f} {result['parses_per_second']:>9.0f}"
+                f" {result['peak_memory_kib']:>9.0f}"
+            )
+
+        crawl = results["crawl"] = await bench_crawl(fake, args.window)
+        print(
+            f"\ncrawl of {crawl['tracks']} scrobbles: {crawl['tracks_per_second']:.0f} tracks/s,"
+            f" {crawl['pages_per_second']:.1f} pages/s, peak {crawl['peak_memory_kib']:.0f} KiB"
+        )
+
+    finally:
+        asyncio.run_coroutine_threadsafe(fake.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--scrobbles", type=int, default=20_000)
+    parser.add_argument("--window", type=int, default=4)
+    parser.add_argument("--json", help="also write the results to this file")
+    asyncio.run(main(parser.parse_args()))
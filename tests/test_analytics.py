@@ -0,0 +1,67 @@
+import sys
+
+import pytest
+
+from asyncfm.analytics import ScrobbleAnalytics
+from asyncfm.columnar import TrackColumns
+from asyncfm.history import ScrobbleStore, SyncState
+from asyncfm.types import Track
+
+PLAYS = [
+    ("Björk", "Jóga", "Homogenic"),
+    ("Björk", "Jóga", "Homogenic"),
+    ("Björk", "Hunter", "Homogenic"),
+    ("Björk", "Army of Me", ""),
+    ("Björk", "Army of Me", ""),
+    ("Björk", "Army of Me", ""),
+    ("Portishead", "Roads", "Dummy"),
+    ("Radiohead", "Creep", ""),
+]
+
+
+@pytest.fixture(params=["numpy", "pure python"])
+def analytics(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setitem(sys.modules, "numpy", None)
+    return ScrobbleAnalytics
+
+
+def columns() -> TrackColumns:
+    columns = TrackColumns()
+    for timestamp, (artist, title, album) in enumerate(PLAYS, start=1):
+        columns.append(artist, title, album, timestamp=timestamp)
+    return columns
+
+
+def test_empty_albums_are_not_ranked(analytics):
+    albums = analytics(columns()).top_albums()
+    assert [
+        (album.artist, album.title, album.playcount) for album in albums.albums
+    ] == [
+        ("Björk", "Homogenic", 3),
+        ("Portishead", "Dummy", 1),
+    ]
+
+
+def test_total_counts_every_item_of_the_window(analytics):
+    stats = analytics(columns())
+    assert stats.top_artists(limit=1).total == 3
+    assert stats.top_tracks(limit=1).total == 5
+    assert stats.top_albums(limit=1).total == 2
+    assert stats.top_artists(from_time=7, limit=1).total == 2
+
+
+def test_stored_scrobbles_without_album(analytics, tmp_path):
+    store = ScrobbleStore(str(tmp_path / "scrobbles.db"))
+    tracks = [
+        Track(artist=artist, title=title, album=album, images=None, timestamp=timestamp)
+        for timestamp, (artist, title, album) in enumerate(PLAYS, start=1)
+    ]
+    store.save("rj", tracks, SyncState(high_water=len(PLAYS)))
+    loaded = store.load_columns("rj")
+    store.close()
+
+    assert loaded[3].album is None
+    assert analytics(loaded).top_albums().total == 2
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+
+from asyncfm.api.scheduler import RequestScheduler
+from asyncfm.blocking import SyncLastFMAPI
+from asyncfm.exceptions import InvalidParametersError
+from asyncfm.testing import FakeLastFM
+
+
+@pytest.fixture(scope="module")
+def fake():
+    """A FakeLastFM served from its own thread, like a remote API."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = FakeLastFM(scrobbles=450, unknown_users={"ghost"})
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+@pytest.fixture
+def lastfm(fake):
+    with SyncLastFMAPI(api_key="key", base_url=fake.url, rate_limit=None) as client:
+        yield client
+
+
+def test_blocking_calls(lastfm):
+    assert lastfm.user.get_info("rj").name == "rj"
+    assert len(list(lastfm.user.iter_recent_tracks("rj"))) == 450
+    assert lastfm.api.session is not None
+
+
+def test_batch_methods(lastfm):
+    results = {
+        result.username: result for result in lastfm.user.get_info_many(["a", "ghost"])
+    }
+    assert results["a"].value.name == "a"
+    assert isinstance(results["ghost"].error, InvalidParametersError)
+
+
+def test_map(lastfm):
+    users = lastfm.map(
+        lastfm.api.user.get_info, ["a", "ghost", "b"], return_exceptions=True
+    )
+    assert users[0].name == "a" and users[2].name == "b"
+    assert isinstance(users[1], InvalidParametersError)
+
+
+def test_calls_from_threads(lastfm):
+    results, errors = {}, []
+
+    def call(username: str):
+        try:
+            results[username] = lastfm.user.get_top_artists(username)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=call, args=(f"user_{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(results) == [f"user_{i}" for i in range(8)]
+    assert all(response.artists for response in results.values())
+    assert lastfm.api.scheduler.in_flight == 0
+
+
+def test_failed_init_stops_the_loop():
+    running = threading.active_count()
+    with pytest.raises(ValueError):
+        SyncLastFMAPI(api_key=["a", "b"], scheduler=RequestScheduler(rate=None))
+    assert threading.active_count() == running
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from asyncfm.api import LastFMAPI
+from asyncfm.cache import CachePolicy, SQLiteCache
+from asyncfm.testing import FakeLastFM
+
+
+def test_expiry(tmp_path):
+    async def main():
+        cache = SQLiteCache(str(tmp_path / "cache.db"))
+        await cache.set("fresh", {"name": "Björk"}, ttl=60)
+        await cache.set("stale", {"name": "Jóga"}, ttl=0.05, stale_ttl=60)
+        await cache.set("expired", {"name": "Army of Me"}, ttl=0.05)
+        await asyncio.sleep(0.1)
+
+        fresh = await cache.get("fresh")
+        assert fresh.fresh and fresh.value == {"name": "Björk"}
+        stale = await cache.get("stale")
+        assert not stale.fresh and stale.value == {"name": "Jóga"}
+        assert await cache.get("expired") is None
+        assert (cache.hits, cache.stale_hits, cache.misses) == (1, 1, 1)
+        cache.close()
+
+    asyncio.run(main())
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path):
+    async def main():
+        cache = SQLiteCache(str(tmp_path / "cache.db"), max_bytes=4096)
+        cache.TOUCH_INTERVAL = 0
+        value = {"text": "x" * 400}
+        for index in range(20):
+            await cache.set(f"key {index}", value, ttl=60)
+            # the first response stays in use
+            await cache.get("key 0")
+            time.sleep(0.001)
+
+        assert await cache.get("key 0") is not None
+        assert await cache.get("key 1") is None
+        assert await cache.get("key 19") is not None
+        (size,) = cache._connect().execute("SELECT SUM(size) FROM responses").fetchone()
+        assert size <= 4096
+        cache.close()
+
+    asyncio.run(main())
+
+
+def test_stale_responses_are_served_while_refreshing(tmp_path):
+    async def main():
+        cache = SQLiteCache(str(tmp_path / "cache.db"))
+        async with FakeLastFM(latency=0.2) as fake:
+            async with LastFMAPI(
+                api_key="key",
+                base_url=fake.url,
+                rate_limit=None,
+                cache=cache,
+                cache_policy=CachePolicy(ttls={"user.getinfo": 0.3}, stale_ttl=60),
+            ) as lastfm:
+                await lastfm.user.get_info("rj")
+                await asyncio.sleep(0.4)
+
+                # served from the cache, refreshed in the background
+                started = time.monotonic()
+                assert (await lastfm.user.get_info("rj")).name == "rj"
+                assert time.monotonic() - started < 0.1
+                assert cache.stale_hits == 1
+
+                await asyncio.sleep(0.25)
+                assert fake.requests["user.getinfo"] == 2
+                # the refreshed response is fresh again
+                await lastfm.user.get_info("rj")
+                assert fake.requests["user.getinfo"] == 2
+                assert cache.stale_hits == 1
+        cache.close()
+
+    asyncio.run(main())
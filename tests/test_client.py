@@ -0,0 +1,258 @@
+import asyncio
+import time
+from typing import Optional
+
+import pytest
+
+from asyncfm.api import LastFMAPI
+from asyncfm.api.breaker import CircuitBreaker
+from asyncfm.api.options import request_options
+from asyncfm.api.retry import RetryPolicy
+from asyncfm.api.scheduler import Priority
+from asyncfm.api.transport import Transport
+from asyncfm.exceptions import (
+    APIKeySuspendedError,
+    CircuitOpenError,
+    DeadlineExceededError,
+    HTTPError,
+    InvalidAPIKeyError,
+    InvalidParametersError,
+    RateLimitExceededError,
+    ServerError,
+    ServiceUnavailableError,
+)
+from asyncfm.testing import FakeLastFM
+
+
+def run(test, fake: "Optional[FakeLastFM]" = None, **options):
+    """Runs `test(fake, lastfm)` against a fresh FakeLastFM."""
+
+    async def main():
+        async with fake or FakeLastFM() as server:
+            options.setdefault("api_key", "key")
+            async with LastFMAPI(
+                base_url=server.url, rate_limit=None, **options
+            ) as lastfm:
+                await test(server, lastfm)
+
+    asyncio.run(main())
+
+
+def test_deadlines_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=60)
+
+    async def test(fake, lastfm):
+        for _ in range(2):
+            with pytest.raises(DeadlineExceededError):
+                await lastfm.user.get_info("rj")
+        assert breaker.state == breaker.OPEN
+        assert fake.requests["user.getinfo"] == 2
+
+    run(
+        test,
+        FakeLastFM(latency=1.0),
+        timeout=0.2,
+        circuit_breaker=breaker,
+        coalesce=False,
+    )
+
+
+def test_last_key_is_kept():
+    async def test(fake, lastfm):
+        fake.suspend_key("key")
+        with pytest.raises(APIKeySuspendedError, match="Suspended API key"):
+            await lastfm.user.get_info("rj")
+        fake.inject_error(10, times=1, status=403)
+        with pytest.raises(InvalidAPIKeyError) as error:
+            await lastfm.user.get_info("rj")
+        assert error.value.code == 10
+
+        fake.suspended_keys.clear()
+        assert (await lastfm.user.get_info("rj")).name == "rj"
+
+    run(test, coalesce=False)
+
+
+def test_suspended_keys_leave_the_pool():
+    async def test(fake, lastfm):
+        fake.suspend_key("a")
+        for username in ("rj", "other"):
+            assert (await lastfm.user.get_info(username)).name == username
+        assert [key.key for key in lastfm.keys.healthy] == ["b"]
+
+        fake.suspend_key("b")
+        with pytest.raises(APIKeySuspendedError, match="Suspended API key"):
+            await lastfm.user.get_info("rj")
+        assert [key.key for key in lastfm.keys.healthy] == ["b"]
+
+    run(test, api_key=["a", "b"])
+
+
+def test_pagination():
+    async def test(fake, lastfm):
+        tracks = [track async for track in lastfm.user.iter_recent_tracks("rj")]
+        assert len(tracks) == 450
+        timestamps = [track.timestamp for track in tracks]
+        assert timestamps == sorted(set(timestamps), reverse=True)
+        assert fake.requests["user.getrecenttracks"] == 3
+
+        page = await lastfm.user.get_recent_tracks("rj", limit=200, page=3)
+        assert [track.timestamp for track in page.tracks] == timestamps[400:]
+
+    run(test, FakeLastFM(scrobbles=450))
+
+
+def test_error_documents():
+    async def test(fake, lastfm):
+        with pytest.raises(InvalidParametersError) as error:
+            await lastfm.user.get_info("ghost")
+        assert error.value.code == 6
+
+    run(test, FakeLastFM(unknown_users={"ghost"}))
+
+
+def test_html_error_pages():
+    async def test(fake, lastfm):
+        fake.inject_error(0, times=1, status=503, html=True)
+        with pytest.raises(ServerError) as error:
+            await lastfm.user.get_info("rj")
+        assert error.value.code == 503
+
+        fake.inject_error(0, times=1, status=404, html=True)
+        with pytest.raises(HTTPError) as error:
+            await lastfm.user.get_info("rj")
+        assert not isinstance(error.value, ServerError)
+        assert error.value.code == 404
+
+    run(test, retry_policy=None)
+
+
+def test_html_server_errors_are_retried():
+    async def test(fake, lastfm):
+        fake.inject_error(0, times=2, status=502, html=True)
+        assert (await lastfm.user.get_info("rj")).name == "rj"
+        assert fake.requests["user.getinfo"] == 3
+
+    run(test, retry_policy=RetryPolicy(base_delay=0.01))
+
+
+def test_rate_limit_errors_are_retried():
+    async def test(fake, lastfm):
+        fake.inject_error(29, times=2, status=429)
+        assert (await lastfm.user.get_info("rj")).name == "rj"
+        assert fake.requests["user.getinfo"] == 3
+        # rate limiting halves the requests allowed in flight
+        assert lastfm.scheduler.limit < 10
+
+        fake.inject_error(29, status=429)
+        with pytest.raises(RateLimitExceededError):
+            await lastfm.user.get_info("rj")
+        assert fake.requests["user.getinfo"] == 6
+
+    run(test, retry_policy=RetryPolicy(attempts=3, base_delay=0.01))
+
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=0.2)
+
+    async def test(fake, lastfm):
+        fake.inject_error(16, status=503)
+        for _ in range(2):
+            with pytest.raises(ServiceUnavailableError):
+                await lastfm.user.get_info("rj")
+        assert breaker.state == breaker.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            await lastfm.user.get_info("rj")
+        assert fake.requests["user.getinfo"] == 2
+
+        # a failed trial request reopens the circuit
+        await asyncio.sleep(0.25)
+        assert breaker.state == breaker.HALF_OPEN
+        with pytest.raises(ServiceUnavailableError):
+            await lastfm.user.get_info("rj")
+        assert breaker.state == breaker.OPEN
+
+        # a successful one closes it
+        fake.clear_errors()
+        await asyncio.sleep(0.25)
+        assert (await lastfm.user.get_info("rj")).name == "rj"
+        assert breaker.state == breaker.CLOSED
+        assert fake.requests["user.getinfo"] == 4
+
+    run(test, circuit_breaker=breaker, retry_policy=None)
+
+
+def test_last_key_is_not_retried():
+    async def test(fake, lastfm):
+        for key in ("a", "b", "c"):
+            fake.suspend_key(key)
+        with pytest.raises(APIKeySuspendedError):
+            await lastfm.user.get_info("rj")
+        assert fake.requests["user.getinfo"] == 3
+        assert [key.key for key in lastfm.keys.healthy] == ["c"]
+
+        with pytest.raises(APIKeySuspendedError):
+            await lastfm.user.get_info("rj")
+        assert fake.requests["user.getinfo"] == 4
+
+    run(test, api_key=["a", "b", "c"], coalesce=False)
+
+
+def test_high_priority_calls_do_not_join_low_flights():
+    async def test(fake, lastfm):
+        with request_options(priority=Priority.LOW):
+            backfill = [
+                asyncio.ensure_future(lastfm.user.get_info(username))
+                for username in [f"user_{i}" for i in range(10)] + ["rj"]
+            ]
+        await asyncio.sleep(0)
+
+        started = time.monotonic()
+        with request_options(priority=Priority.HIGH):
+            assert (await lastfm.user.get_info("rj")).name == "rj"
+        # served right after the request in flight, not after the backfill
+        assert time.monotonic() - started < 0.5
+        await asyncio.gather(*backfill)
+
+    run(test, FakeLastFM(latency=0.1), max_concurrency=1)
+
+
+def test_names_are_shared_across_responses():
+    async def test(fake, lastfm):
+        user = lastfm.user
+        for fetch, items, fields in [
+            (user.get_recent_tracks, "tracks", ("artist", "title", "album")),
+            (user.get_top_artists, "artists", ("name",)),
+            (user.get_top_albums, "albums", ("artist", "title")),
+            (user.get_top_tracks, "tracks", ("artist", "title")),
+            (user.get_weekly_artist_chart, "artists", ("name",)),
+            (user.get_weekly_album_chart, "albums", ("artist", "title")),
+            (user.get_weekly_track_chart, "tracks", ("artist", "title")),
+        ]:
+            first, second = [getattr(await fetch("rj"), items)[0] for _ in range(2)]
+            for field in fields:
+                assert getattr(first, field) is getattr(second, field), (fetch, field)
+
+    run(test, coalesce=False)
+
+
+def test_shared_transport_stays_open_for_its_users():
+    async def main():
+        async with FakeLastFM(latency=0.1) as fake:
+            transport = Transport()
+            first = LastFMAPI(api_key="a", base_url=fake.url, transport=transport)
+            async with LastFMAPI(
+                api_key="b", base_url=fake.url, transport=transport
+            ) as second:
+                request = asyncio.ensure_future(second.user.get_info("rj"))
+                await asyncio.sleep(0.05)
+                # never opened, closing must not release the session of the other
+                await first.close()
+                async with first:
+                    pass
+                assert (await request).name == "rj"
+                assert not transport.session.closed
+            assert transport.session.closed
+
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from asyncfm.api import LastFMAPI
+from asyncfm.exceptions import OperationFailedError
+from asyncfm.history import HistorySync, ScrobbleStore
+from asyncfm.testing import FakeLastFM
+
+
+def run(test, fake: FakeLastFM, tmp_path):
+    """Runs `test(fake, sync, store)` against a fresh FakeLastFM and ScrobbleStore."""
+
+    async def main():
+        async with fake:
+            async with LastFMAPI(
+                api_key="key", base_url=fake.url, rate_limit=None, retry_policy=None
+            ) as lastfm:
+                store = ScrobbleStore(str(tmp_path / "scrobbles.db"))
+                try:
+                    await test(fake, HistorySync(lastfm, store, window=1), store)
+                finally:
+                    store.close()
+
+    asyncio.run(main())
+
+
+def timestamps(store: ScrobbleStore):
+    return [track.timestamp for track in store.scrobbles("rj")]
+
+
+def page(*plays):
+    """A recent tracks document with the (timestamp, title) plays, newest first."""
+    return {
+        "recenttracks": {
+            "track": [
+                {
+                    "artist": {"#text": "Artist", "mbid": ""},
+                    "name": title,
+                    "album": {"#text": "Album", "mbid": ""},
+                    "image": [
+                        {
+                            "size": size,
+                            "#text": f"https://lastfm.freetls.fastly.net/{size}.png",
+                        }
+                        for size in ("small", "medium", "large", "extralarge")
+                    ],
+                    "mbid": "",
+                    "date": {"uts": str(timestamp)},
+                    "loved": "0",
+                }
+                for timestamp, title in plays
+            ],
+            "@attr": {"page": "1", "totalPages": "1", "total": str(len(plays))},
+        }
+    }
+
+
+def test_interrupted_run_resumes(tmp_path):
+    async def test(fake, sync, store):
+        fake.inject_error(8, times=1, method="user.getrecenttracks", page=3)
+        with pytest.raises(OperationFailedError):
+            await sync.sync("rj")
+        assert store.count("rj") == 400
+        assert store.state("rj").next_page == 3
+
+        assert await sync.sync("rj") == 600
+        # pages 1 and 2 are not read again
+        assert fake.requests["user.getrecenttracks"] == 6
+        stored = timestamps(store)
+        assert len(stored) == len(set(stored)) == 1000
+        assert store.state("rj").next_page is None
+
+    run(test, FakeLastFM(scrobbles=1000), tmp_path)
+
+
+def test_incremental_run(tmp_path):
+    async def test(fake, sync, store):
+        assert await sync.sync("rj") == 1000
+        requests = fake.requests["user.getrecenttracks"]
+
+        fake.scrobbles = 1300
+        assert await sync.sync("rj") == 300
+        # only the 301 plays from the newest stored one on, in two pages
+        assert fake.requests["user.getrecenttracks"] - requests == 2
+        assert await sync.sync("rj") == 0
+        assert store.count("rj") == 1300
+
+    run(test, FakeLastFM(scrobbles=1000), tmp_path)
+
+
+def test_plays_sharing_the_boundary_timestamp(tmp_path):
+    async def test(fake, sync, store):
+        fake.fixtures["user.getrecenttracks"] = page((100, "A"), (99, "Z"))
+        assert await sync.sync("rj") == 2
+
+        # "B" was scrobbled in the same second as the newest play stored
+        fake.fixtures["user.getrecenttracks"] = page((101, "C"), (100, "B"), (100, "A"))
+        assert await sync.sync("rj") == 2
+        assert sorted(
+            (track.timestamp, track.title) for track in store.scrobbles("rj")
+        ) == [(99, "Z"), (100, "A"), (100, "B"), (101, "C")]
+        assert store.state("rj").high_water == 101
+
+    run(test, FakeLastFM(), tmp_path)
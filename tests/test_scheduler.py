@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from asyncfm.api.scheduler import Priority, RequestScheduler
+
+
+def test_requests_are_paced_by_the_token_bucket():
+    async def main():
+        scheduler = RequestScheduler(rate=20, burst=2, max_concurrency=100)
+        started = time.monotonic()
+        times = []
+        for _ in range(12):
+            async with scheduler.slot():
+                times.append(time.monotonic() - started)
+
+        # the burst goes through at once, then one request every 50 ms
+        assert times[1] < 0.02
+        assert 0.45 <= times[-1] < 0.7
+
+    asyncio.run(main())
+
+
+def test_in_flight_requests_are_limited():
+    async def main():
+        scheduler = RequestScheduler(rate=None, max_concurrency=3)
+        for _ in range(3):
+            await scheduler.acquire()
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done() and scheduler.queued == 1
+
+        scheduler.release()
+        await asyncio.sleep(0)
+        assert waiter.done() and scheduler.in_flight == 3
+
+    asyncio.run(main())
+
+
+def test_lanes_are_served_by_priority():
+    async def main():
+        scheduler = RequestScheduler(rate=None, max_concurrency=1)
+        order = []
+
+        async def call(priority: Priority):
+            async with scheduler.slot(priority):
+                order.append(priority)
+
+        await scheduler.acquire()
+        calls = [
+            asyncio.ensure_future(call(priority))
+            for priority in (Priority.LOW, Priority.NORMAL, Priority.HIGH)
+        ]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*calls)
+        assert order == [Priority.HIGH, Priority.NORMAL, Priority.LOW]
+
+    asyncio.run(main())
+
+
+def test_low_priority_requests_run_under_constant_high_load():
+    async def main():
+        scheduler = RequestScheduler(rate=None, max_concurrency=1, starvation_limit=3)
+        order = []
+
+        async def call(priority: Priority):
+            async with scheduler.slot(priority):
+                order.append(priority)
+                await asyncio.sleep(0)
+
+        async def high_load():
+            # always keeps HIGH requests waiting
+            while Priority.LOW not in order:
+                await asyncio.gather(*(call(Priority.HIGH) for _ in range(2)))
+
+        load = [asyncio.ensure_future(high_load()) for _ in range(3)]
+        await asyncio.sleep(0)
+        await asyncio.wait_for(call(Priority.LOW), timeout=1)
+        await asyncio.gather(*load)
+        assert order.index(Priority.LOW) <= 3 + 1
+
+    asyncio.run(main())
+
+
+def test_concurrency_adapts_within_bounds():
+    scheduler = RequestScheduler(
+        rate=None, max_concurrency=8, min_concurrency=2, decrease_interval=0
+    )
+    limits = []
+    for _ in range(4):
+        scheduler.on_overload()
+        limits.append(scheduler.limit)
+    assert limits == [4, 2, 2, 2]
+
+    # grows by about one slot per round of `limit` successful requests
+    for _ in range(3):
+        scheduler.on_success()
+    assert scheduler.limit == 3
+    for _ in range(100):
+        scheduler.on_success()
+    assert scheduler.limit == 8
+
+
+def test_overload_bursts_count_once():
+    scheduler = RequestScheduler(rate=None, max_concurrency=8, decrease_interval=60)
+    for _ in range(5):
+        scheduler.on_overload()
+    assert scheduler.limit == 4
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        RequestScheduler(max_concurrency=2, min_concurrency=3)
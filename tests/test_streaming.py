@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from asyncfm.api.streaming import JSONArrayStream
+
+PATH = ("recenttracks", "track")
+
+DOCUMENT = json.dumps(
+    {
+        "count": 12345,
+        "ratio": -1.5e-3,
+        "flags": [True, False, None],
+        "recenttracks": {
+            "@attr": {"user": "rj", "page": "1", "total": 3},
+            "track": [
+                12345,
+                6,
+                {"name": "Dreams", "date": {"uts": 1700000000}, "loved": True},
+                {"name": 'Jóga "live"', "artist": {"#text": "Björk"}, "n": 0.25},
+                "text",
+                None,
+                [1, [2, 3]],
+            ],
+        },
+        "after": 7,
+    },
+    ensure_ascii=False,
+).encode()
+
+EXPECTED = json.loads(DOCUMENT)["recenttracks"]["track"]
+
+
+def parse(chunks):
+    stream = JSONArrayStream(PATH)
+    elements = []
+    for chunk in chunks:
+        elements += stream.feed(chunk)
+    stream.close()
+    return elements
+
+
+def test_whole_document():
+    assert parse([DOCUMENT]) == EXPECTED
+
+
+@pytest.mark.parametrize("offset", range(1, len(DOCUMENT)))
+def test_split_at_every_offset(offset):
+    assert parse([DOCUMENT[:offset], DOCUMENT[offset:]]) == EXPECTED
+
+
+def test_byte_by_byte():
+    assert parse([DOCUMENT[i : i + 1] for i in range(len(DOCUMENT))]) == EXPECTED
+
+
+def test_missing_array():
+    assert parse([b'{"recenttracks": {"track": null}, "n": 1}']) == []
+    assert parse([b'{"error": 6, "message": "User not found"}']) == []
+
+
+@pytest.mark.parametrize("offset", range(1, len(DOCUMENT) - 1))
+def test_truncated_document(offset):
+    stream = JSONArrayStream(PATH)
+    stream.feed(DOCUMENT[:offset])
+    if not stream.done:
+        with pytest.raises(ValueError):
+            stream.close()